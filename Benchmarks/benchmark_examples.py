@@ -0,0 +1,53 @@
+import argparse
+from pathlib import Path
+
+from benchmark_parser import benchmark_parser
+from benchmark_utility import add_common_args, load_previous_results, \
+    make_report, make_result, print_result, write_report
+
+EXAMPLES_DIRECTORY = Path(__file__).absolute().parent.parent / 'Examples'
+DEFAULT_SCALES = (1, 10, 100)
+
+
+def scale_up(source, scale):
+    """Returns the program repeated scale times, which still parses."""
+    return (source.rstrip('\n') + '\n\n') * scale
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Times Parser.parse() on the programs in Examples and '
+                    'on longer programs made by repeating them')
+    parser.add_argument('--scales', type=int, nargs='+',
+                        default=DEFAULT_SCALES,
+                        help='numbers of times every example is repeated')
+    parser.add_argument('--examples', type=str,
+                        default=str(EXAMPLES_DIRECTORY),
+                        help='directory of the programs to parse')
+    add_common_args(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    key = ('example', 'scale')
+    previous = {} if args.compare is None \
+        else load_previous_results(args.compare, key)
+    report = make_report('examples', args)
+    paths = sorted(Path(args.examples).glob('*.fim'))
+    width = max((len(path.stem) for path in paths), default=0)
+    for path in paths:
+        source = path.read_text(encoding='utf-8')
+        for scale in args.scales:
+            scaled_source = scale_up(source, scale)
+            result = make_result(
+                scaled_source, *benchmark_parser(scaled_source, args.repeat),
+                example=path.stem, scale=scale)
+            report['results'].append(result)
+            print_result(f'{path.stem:<{width}} x{scale:<5}', result,
+                         previous.get((path.stem, scale)))
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+from benchmark_utility import measure_time, measure_peak_memory, \
+    run_benchmark
+from fim_lexer import Lexer
+
+
+def lex(source):
+    lexer = Lexer(source)
+    return lexer.lex()
+
+
+def benchmark_lexer(source, repeat):
+    # the first run also builds the scanners, so it is not timed
+    token_count = len(lex(source))
+    return (token_count,
+            measure_time(lex, repeat, lambda: source),
+            measure_peak_memory(lex, lambda: source))
+
+
+if __name__ == '__main__':
+    run_benchmark('lexer', 'Times Lexer.lex() on generated programs',
+                  benchmark_lexer)
@@ -0,0 +1,24 @@
+from benchmark_utility import measure_time, measure_peak_memory, \
+    run_benchmark
+from fim_lexer import Lexer
+from fim_parser import Parser
+
+
+def benchmark_parser(source, repeat):
+    def lex():
+        # the parser changes some tokens, so every run gets its own
+        lexer = Lexer(source)
+        lexer.lex()
+        return lexer
+
+    def parse(lexer):
+        Parser(lexer).parse()
+
+    return (len(lex().tokens),
+            measure_time(parse, repeat, lex),
+            measure_peak_memory(parse, lex))
+
+
+if __name__ == '__main__':
+    run_benchmark('parser', 'Times Parser.parse() on generated programs '
+                            'lexed beforehand', benchmark_parser)
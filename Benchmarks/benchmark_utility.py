@@ -0,0 +1,144 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from program_generator import generate_program, parse_mix, DEFAULT_MIX
+
+# the benchmarks import the interpreter modules after this module
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent))
+
+DEFAULT_SIZES = (1000, 5000, 20000)
+
+
+def get_git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=Path(__file__).absolute().parent, capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure_time(function, repeat, setup=lambda: None):
+    """Returns the best time of repeat calls of function(setup())."""
+    best = float('inf')
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_peak_memory(function, setup=lambda: None):
+    argument = setup()
+    tracemalloc.start()
+    try:
+        function(argument)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def print_result(label, result, previous=None):
+    line = (f'{label} '
+            f'{result["tokens"]:>9} tokens '
+            f'{result["seconds"]:>9.4f} s '
+            f'{result["tokens_per_second"]:>12,.0f} tokens/s '
+            f'{result["peak_memory_bytes"] / 2 ** 20:>8.2f} MiB')
+    if previous is not None:
+        speedup = result['tokens_per_second'] / \
+            previous['tokens_per_second']
+        memory = result['peak_memory_bytes'] / \
+            previous['peak_memory_bytes']
+        line += f'  x{speedup:.2f} speed  x{memory:.2f} memory'
+    print(line)
+
+
+def load_previous_results(path, key='statements'):
+    with open(path, encoding='utf-8') as results_file:
+        report = json.load(results_file)
+    return {get_result_key(result, key): result
+            for result in report['results']}
+
+
+def get_result_key(result, key):
+    if isinstance(key, tuple):
+        return tuple(result[name] for name in key)
+    return result[key]
+
+
+def make_report(name, args, **settings):
+    return {
+        'benchmark': name,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'commit': get_git_commit(),
+        'repeat': args.repeat,
+        **settings,
+        'results': [],
+    }
+
+
+def make_result(source, token_count, seconds, peak_memory, **key):
+    return {
+        **key,
+        'source_bytes': len(source.encode()),
+        'tokens': token_count,
+        'seconds': seconds,
+        'tokens_per_second': token_count / seconds,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def write_report(report, path):
+    if path is not None:
+        with open(path, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=4)
+
+
+def run_benchmark(name, description, benchmark):
+    """Runs benchmark(source, repeat), which returns the number of tokens,
+    the best time and the peak memory, on generated programs of every size
+    from the command line."""
+    args = parse_args(description)
+    mix = DEFAULT_MIX if args.mix is None else parse_mix(args.mix)
+    previous = {} if args.compare is None \
+        else load_previous_results(args.compare)
+    report = make_report(name, args, seed=args.seed, mix=mix)
+    for statements in args.sizes:
+        source = generate_program(statements, mix, args.seed)
+        result = make_result(source, *benchmark(source, args.repeat),
+                             statements=statements)
+        report['results'].append(result)
+        print_result(f'{statements:>8} statements', result,
+                     previous.get(statements))
+    write_report(report, args.output)
+
+
+def parse_args(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=DEFAULT_SIZES,
+                        help='numbers of statements in generated programs')
+    parser.add_argument('--mix', type=str,
+                        help='statement weights, e.g. loop=1,string=2')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the program generator')
+    add_common_args(parser)
+    return parser.parse_args()
+
+
+def add_common_args(parser):
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of timed runs, the best one is kept')
+    parser.add_argument('-o', '--output', type=str,
+                        help='path to write the results as JSON')
+    parser.add_argument('--compare', type=str,
+                        help='JSON results of an earlier run to compare to')
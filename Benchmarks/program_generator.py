@@ -0,0 +1,149 @@
+import random
+
+DEFAULT_MIX = {
+    'loop': 1,
+    'arithmetic': 3,
+    'string': 2,
+    'comment': 1,
+    'array': 1,
+}
+
+NAME_WORDS = ('apple', 'cherry', 'muffin', 'cupcake', 'scone', 'pretzel',
+              'cookie', 'donut', 'pie', 'tart', 'cake', 'fritter')
+SENTENCE_WORDS = ('friendship', 'magic', 'ponies', 'rainbows', 'cupcakes',
+                  'parties', 'books', 'apples', 'clouds', 'sunshine')
+NUMBER_COUNT = 8
+ARRAY_SIZE = 4
+
+
+def parse_mix(text):
+    """Parses 'loop=1,string=2' into a mix of statement weights."""
+    mix = {}
+    for item in text.split(','):
+        name, weight = item.split('=')
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'unknown statement kind {name!r}, expected '
+                             f'one of {", ".join(DEFAULT_MIX)}')
+        mix[name] = float(weight)
+    return mix
+
+
+def generate_program(statements, mix=None, seed=0, max_loop_depth=3):
+    """Returns a valid report with about the given number of statements,
+    chosen according to the weights in mix."""
+    return ProgramGenerator(mix, seed, max_loop_depth).generate(statements)
+
+
+class ProgramGenerator:
+    def __init__(self, mix=None, seed=0, max_loop_depth=3):
+        mix = DEFAULT_MIX if mix is None else mix
+        self.kinds = [kind for kind in mix if mix[kind] > 0]
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.random = random.Random(seed)
+        self.max_loop_depth = max_loop_depth
+        self.numbers = [f'{first} {second}' for first, second
+                        in zip(NAME_WORDS, NAME_WORDS[1:])][:NUMBER_COUNT]
+        self.array = 'pastry shelf'
+        self.array_index = 'shelf index'
+        self.lines = []
+        self.loop_count = 0
+
+    def generate(self, statements):
+        self.loop_count = 0
+        self.lines = ['Dear Princess Celestia: Benchmark!', '',
+                      'Today I learned how to run the benchmark!']
+        for number in self.numbers:
+            self._add_line(1, f'Did you know that {number} is the number '
+                              f'{self.random.randint(0, 9)}?')
+        self._add_line(1, f'Did you know that {self.array} has many '
+                          f'numbers?')
+        for index in range(1, ARRAY_SIZE + 1):
+            self._add_line(1, f'{self.array} {index} is {index}.')
+        self._add_line(1, f'Did you know that {self.array_index} is the '
+                          f'number {self.random.randint(1, ARRAY_SIZE)}?')
+        count = len(self.numbers) + ARRAY_SIZE + 2
+        while count < statements:
+            count += self._add_statement(1, statements - count)
+        self.lines += ['That’s all about how to run the benchmark!', '',
+                       'Your faithful student, Pinkie Pie.', '']
+        return '\n'.join(self.lines)
+
+    def _add_line(self, depth, line):
+        self.lines.append('    ' * depth + line)
+
+    def _add_statement(self, depth, budget):
+        kind = self.random.choices(self.kinds, self.weights)[0]
+        if kind == 'loop' and depth <= self.max_loop_depth and budget > 2:
+            return self._add_loop(depth, budget)
+        if kind == 'loop':
+            kind = 'arithmetic'
+        return getattr(self, f'_add_{kind}')(depth)
+
+    def _add_loop(self, depth, budget):
+        variable = self._get_loop_variable()
+        self._add_line(depth, f'For every number {variable} from 1 to '
+                              f'{self.random.randint(2, 5)}...')
+        # a loop whose body is only comments does not parse
+        count = 2 + self._add_arithmetic(depth + 1)
+        body_size = self.random.randint(1, max(1, min(budget - 2, 6)))
+        while count - 2 < body_size:
+            count += self._add_statement(depth + 1, budget - count)
+        self._add_line(depth, 'That’s what I did.')
+        return count
+
+    def _get_loop_variable(self):
+        # names must not repeat inside a paragraph and cannot have digits
+        words = ['counter']
+        number = self.loop_count
+        self.loop_count += 1
+        while True:
+            number, digit = divmod(number, len(NAME_WORDS))
+            words.insert(0, NAME_WORDS[digit])
+            if number == 0:
+                return ' '.join(words)
+
+    def _add_arithmetic(self, depth):
+        target, left, right = (self.random.choice(self.numbers)
+                               for _ in range(3))
+        template = self.random.choice((
+            '{target} becomes add {left} and {right}.',
+            '{target} becomes {left} plus {right}.',
+            '{target} becomes {left} minus {number}.',
+            '{target} becomes multiply {left} and {number}.',
+            'I said {left} modulo 7!',
+            '{target} got one more.',
+        ))
+        self._add_line(depth, template.format(
+            target=target, left=left, right=right,
+            number=self.random.randint(1, 9)))
+        return 1
+
+    def _add_string(self, depth):
+        words = ' '.join(self.random.choices(SENTENCE_WORDS, k=4))
+        if self.random.random() < 0.5:
+            self._add_line(depth, f'I said "{words}"!')
+        else:
+            number = self.random.choice(self.numbers)
+            self._add_line(depth, f'I said "{words} " {number}!')
+        return 1
+
+    def _add_comment(self, depth):
+        words = ' '.join(self.random.choices(SENTENCE_WORDS, k=6))
+        if self.random.random() < 0.5:
+            self._add_line(depth, f'P.S. {words}')
+        else:
+            self._add_line(depth, f'({words})')
+        return 1
+
+    def _add_array(self, depth):
+        index = self.random.randint(1, ARRAY_SIZE)
+        if self.random.random() < 0.5:
+            number = self.random.choice(self.numbers)
+            self._add_line(depth, f'{self.array} {index} is {number}.')
+        elif depth == 1:
+            self._add_line(depth, f'I said {self.array} {index}!')
+        else:
+            # literal indexes cannot be read inside nested blocks
+            self._add_line(depth, f'I said {self.array}`s '
+                                  f'{self.array_index}!')
+        return 1
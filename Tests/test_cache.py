@@ -0,0 +1,88 @@
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+import fim_ast
+from fim_cache import TreeCache, CACHE_DIRECTORY_NAME
+from tree_utility import parse
+
+
+class _Planted:
+    """Creates the marker file when it is unpickled."""
+
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __reduce__(self):
+        return exec, (f'open({str(self.marker)!r}, "w").close()',)
+
+
+class Base(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.program_path = Path(self.directory.name) / 'Hello.fim'
+        self.cache = TreeCache(self.program_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get_cache_files(self):
+        directory = Path(self.directory.name) / CACHE_DIRECTORY_NAME
+        return list(directory.iterdir())
+
+
+class TestTreeCache(Base):
+    def testLoadWithoutSave(self):
+        self.assertTrue(self.cache.load('I said "Hello"!') is None)
+
+    def testSaveAndLoad(self):
+        program = 'I said "Hello"!'
+        self.cache.save(program, parse(program))
+        tree = self.cache.load(program)
+        self.assertTrue(isinstance(tree, fim_ast.Root))
+        self.assertTrue(isinstance(tree.children[0], fim_ast.Print))
+        self.assertTrue(tree.children[0].line == 0)
+
+    def testChangedSourceIsNotLoaded(self):
+        self.cache.save('I said "Hello"!', parse('I said "Hello"!'))
+        self.assertTrue(self.cache.load('I said "Bye"!') is None)
+
+    def testStaleEntryIsRemoved(self):
+        self.cache.save('I said "Hello"!', parse('I said "Hello"!'))
+        self.cache.save('I said "Bye"!', parse('I said "Bye"!'))
+        self.assertTrue(len(self.get_cache_files()) == 1)
+
+    def testPickledEntryIsRemoved(self):
+        self.cache.directory.mkdir()
+        pickled_path = self.cache.directory / 'Hello.fim.0123abcd.pickle'
+        pickled_path.write_bytes(b'')
+        self.cache.save('I said "Hello"!', parse('I said "Hello"!'))
+        self.assertFalse(pickled_path.exists())
+        self.assertTrue(len(self.get_cache_files()) == 1)
+
+    def testPickledEntryIsNotRun(self):
+        program = 'I said "Hello"!'
+        marker = Path(self.directory.name) / 'ran'
+        self.cache.directory.mkdir()
+        self.cache.get_path(program).write_bytes(
+            pickle.dumps(_Planted(marker)))
+        self.assertTrue(self.cache.load(program) is None)
+        self.assertFalse(marker.exists())
+
+    def testEntryOfAnotherSourceIsIgnored(self):
+        self.cache.save('I said "Hello"!', parse('I said "Hello"!'))
+        # an entry copied to the name of another program's entry
+        path = self.cache.get_path('I said "Bye"!')
+        self.cache.get_path('I said "Hello"!').rename(path)
+        self.assertTrue(self.cache.load('I said "Bye"!') is None)
+
+    def testCorruptedEntryIsIgnored(self):
+        program = 'I said "Hello"!'
+        self.cache.save(program, parse(program))
+        self.cache.get_path(program).write_bytes(b'not a tree')
+        self.assertTrue(self.cache.load(program) is None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,7 @@
+import operator
 import unittest
-import fim_ast
 
 from environment import Environment
-from fim_lexer import Token, Literals
 
 
 class Base(unittest.TestCase):
@@ -15,14 +14,13 @@ class Base(unittest.TestCase):
 
 class EnvironmentTests(Base):
     def testGetAt(self):
-        ancestor = Environment()
-        var = fim_ast.Var(Token('a', Literals.ID, None, None, None, None))
-        ancestor.define(var.token.value, "Hello World!")
+        ancestor = Environment(None, ('a', 'b'))
+        ancestor.slots[1] = "Hello World!"
         env = ancestor
         for i in range(4):
             env = Environment(env)
 
-        res = env.get_at(4, var.token.value)
+        res = env.get_at(4, 1)
         self.assertTrue(res == "Hello World!")
 
     def testAncestorNoAncestors(self):
@@ -39,15 +37,27 @@ class EnvironmentTests(Base):
         self.assertTrue(res is ancestor)
 
     def testAssignAt(self):
-        ancestor = Environment()
-        var = fim_ast.Var(Token('a', Literals.ID, None, None, None, None))
-        ancestor.define(var.token.value, "before")
+        ancestor = Environment(None, ('a',))
+        ancestor.slots[0] = "before"
         env = ancestor
         for i in range(4):
             env = Environment(env)
 
-        env.assign_at(4, var.token, "after")
-        self.assertTrue(ancestor._values[var.token.value] == "after")
+        env.assign_at(4, 0, "after")
+        self.assertTrue(ancestor.slots[0] == "after")
+
+    def testModifyAt(self):
+        ancestor = Environment(None, ('a',))
+        ancestor.slots[0] = 1.0
+        env = Environment(ancestor)
+        env.modify_at(1, 0, operator.add, 2.0)
+        self.assertEqual(ancestor.slots, [3.0])
+
+    def testStrShowsNamesOfSlots(self):
+        env = Environment(None, ('a', 'b'))
+        env.define('c', 3.0)
+        env.slots[:] = [1.0, 'two']
+        self.assertEqual(str(env), "{'c': 3.0,\n'a': 1.0,\n'b': 'two',}")
 
 
 if __name__ == '__main__':
@@ -3,22 +3,35 @@ import sys
 import io
 from fim_lexer import Lexer
 from fim_parser import Parser
+from fim_compiler import CompilingInterpreter
 from fim_interpreter import Interpreter
 from fim_resolver import Resolver
 
 
-def interpret(program):
+def interpret(program, interpreter_class=Interpreter):
     lexer = Lexer(program)
     lexer.lex()
     parser = Parser(lexer)
-    interpreter = Interpreter(parser)
+    interpreter = interpreter_class(parser)
     tree = parser.parse()
     resolver = Resolver(interpreter)
     resolver.resolve(tree)
     interpreter.interpret(tree)
+    return interpreter
+
+READ_PROGRAM = """Did you know that count is the number 1?
+Did you know that answer is a word?
+As long as count had no more than 3...
+I heard answer.
+I said answer.
+count got one more!
+That's what I did.
+"""
 
 
 class Base(unittest.TestCase):
+    interpreter_class = Interpreter
+
     def setUp(self):
         pass
 
@@ -29,10 +42,11 @@ class Base(unittest.TestCase):
         self.old_stdout = sys.stdout  # Memorize the default stdout stream
         sys.stdout = self.buffer = io.StringIO()
 
-        interpret(program)
+        interpreter = interpret(program, self.interpreter_class)
         self.assertEqual(self.buffer.getvalue(), expected)
 
         sys.stdout = self.old_stdout
+        return interpreter
 
 
 drinking_song = """
@@ -408,6 +422,29 @@ Your faithful student, Kyli Rouge. (End the class and sign your name)""",
         self.assert_printed("""
 For every number x from 1 to 5,
 I said x!
+That’s what I did.""", '1\n2\n3\n4\n5\n')
+
+    def testNestedFor(self):
+        self.assert_printed("""
+For every number x from 1 to 3,
+For every number y from x to 3,
+I said x times y!
+That’s what I did.
+That’s what I did.""", '1\n2\n3\n4\n6\n9\n')
+
+    def testForVariableChangedInBody(self):
+        self.assert_printed("""
+For every number x from 1 to 10,
+I said x!
+x got one more.
+That’s what I did.""", '1\n3\n5\n7\n9\n')
+
+    def testForBoundChangedInBody(self):
+        self.assert_printed("""
+Did you know that n is the number 3?
+For every number x from 1 to n,
+I said x!
+n is now 5.
 That’s what I did.""", '1\n2\n3\n4\n5\n')
 
     def testForIter(self):
@@ -432,6 +469,15 @@ For every character c in A...
 I said c.
 That’s what I did.""", '0\n42\n69\n')
 
+    def testRead(self):
+        old_stdin = sys.stdin
+        sys.stdin = io.StringIO('Applejack\n"Rarity"\nFluttershy\n')
+        try:
+            self.assert_printed(READ_PROGRAM,
+                                'Applejack\nRarity\nFluttershy\n')
+        finally:
+            sys.stdin = old_stdin
+
     def testNothing(self):
         self.assert_printed("""
     Did you know that string is a word?
@@ -441,5 +487,26 @@ That’s what I did.""", '0\n42\n69\n')
     """, 'nothing\nnothing\n')
 
 
+class TestCompiledOperators(TestOperators):
+    interpreter_class = CompilingInterpreter
+
+
+class TestCompiledPrograms(TestPrograms):
+    interpreter_class = CompilingInterpreter
+
+    def testReadsDoNotCompileNodes(self):
+        old_stdin = sys.stdin
+        try:
+            sys.stdin = io.StringIO('pony\n' * 3)
+            few = self.assert_printed(READ_PROGRAM, 'pony\n' * 3)
+            sys.stdin = io.StringIO('pony\n' * 30)
+            many = self.assert_printed(
+                READ_PROGRAM.replace('no more than 3', 'no more than 30'),
+                'pony\n' * 30)
+        finally:
+            sys.stdin = old_stdin
+        self.assertEqual(len(many.code), len(few.code))
+
+
 if __name__ == '__main__':
     unittest.main()
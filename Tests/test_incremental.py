@@ -0,0 +1,184 @@
+import random
+import unittest
+
+from fim_exception import FimParserException
+from fim_incremental import IncrementalParser
+from tree_utility import parse, dump
+
+REPORT = '''Dear Princess Celestia: Counting Lessons!
+
+    Did you know that count is the number 1?
+
+    I learned how to count.
+        count got one more.
+        In regards to count:
+            On the 2nd hoof...
+                I said "two".
+            If all else fails...
+                I said count!
+        That's what I did.
+    That's all about how to count.
+
+    I learned how to say hello.
+        I said "Hello"!
+    That's all about how to say hello.
+
+    Today I learned something.
+        I remembered how to count!
+        I remembered how to say hello!
+    That's all about something!
+
+Your faithful student, Twilight Sparkle.
+'''
+
+SCRIPT = '''Did you know that apple is the number 1?
+Did you know that cherry is the number 2?
+Did you know that muffin is the number 3?
+Did you know that cupcake is the number 4?
+apple is now add apple and 2.
+I said apple!
+I said "done"!
+'''
+
+SWITCHES = '''Dear Princess Celestia: Greetings!
+
+    I learned how to say hello.
+        I said "Hello"!
+    That's all about how to say hello.
+
+Your faithful student, Twilight Sparkle.
+
+Dear Princess Celestia: Switches!
+
+    Today I learned how to do switch cases!
+        Did you know that tail is the number 1?
+        As long as tail had no more than 3...
+            In regards to tail:
+                On the 1st hoof...
+                    I said "one".
+                On the 2nd hoof...
+                    I said "two".
+                If all else fails...
+                    I said "more".
+            That's what I did.
+            tail got one more!
+        That's what I did.
+    That's all about how to do switch cases.
+
+Your faithful student, Twilight Sparkle.
+'''
+
+
+def edit_randomly(source, rng):
+    """Deletes, copies, swaps or renumbers a random line of source."""
+    lines = source.splitlines(keepends=True)
+    i = rng.randrange(len(lines))
+    edit = rng.randrange(4)
+    if edit == 0 and len(lines) > 1:
+        del lines[i]
+    elif edit == 1:
+        lines.insert(i, lines[i])
+    elif edit == 2 and i + 1 < len(lines):
+        lines[i], lines[i + 1] = lines[i + 1], lines[i]
+    else:
+        lines[i] = lines[i].replace('1', str(rng.randrange(100)))
+    return ''.join(lines)
+
+
+class IncrementalParserTests(unittest.TestCase):
+    def assertParsedAsWhole(self, tree, source):
+        self.assertEqual(dump(tree), dump(parse(source)))
+
+    def testParse(self):
+        parser = IncrementalParser(REPORT)
+        self.assertParsedAsWhole(parser.tree, REPORT)
+
+    def testEditInParagraph(self):
+        parser = IncrementalParser(REPORT)
+        report = parser.tree.children[0]
+        field, count, hello, main = report.body.children
+        source = REPORT.replace('I said "Hello"!',
+                                'I said "Hello"!\n        I said "Hi"!')
+        tree = parser.update(source)
+        self.assertParsedAsWhole(tree, source)
+        self.assertIs(tree.children[0], report)
+        self.assertIs(report.body.children[0], field)
+        self.assertIsNot(report.body.children[2], hello)
+        self.assertIs(report.body.children[3], main)
+        self.assertIs(report.methods['something'], main)
+        self.assertEqual(len(report.methods['how to say hello'].body.children),
+                         2)
+
+    def testEditsInSequence(self):
+        parser = IncrementalParser(REPORT)
+        source = REPORT
+        for old, new in (('number 1', 'number 12'),
+                         ('I said count!', 'I said count!\n        I said 2!'),
+                         ('        I remembered how to say hello!\n', ''),
+                         ('"Hello"', '"Hello there"')):
+            source = source.replace(old, new)
+            self.assertParsedAsWhole(parser.update(source), source)
+
+    def testEditInScript(self):
+        parser = IncrementalParser(SCRIPT)
+        statements = parser.tree.children
+        source = SCRIPT.replace('apple and 2', 'apple and 3')
+        tree = parser.update(source)
+        self.assertParsedAsWhole(tree, source)
+        self.assertIs(tree.children[0], statements[0])
+        self.assertIs(tree.children[-1], statements[-1])
+
+    def testAppend(self):
+        parser = IncrementalParser(SCRIPT)
+        source = SCRIPT + 'I said apple!\n'
+        self.assertParsedAsWhole(parser.update(source), source)
+
+    def testEditBeforeSwitch(self):
+        parser = IncrementalParser(SWITCHES)
+        later_report = parser.tree.children[1]
+        source = SWITCHES.replace('I said "Hello"!',
+                                  'I said "Hello"!\n        I said "Hi"!')
+        tree = parser.update(source)
+        self.assertParsedAsWhole(tree, source)
+        self.assertIs(tree.children[1], later_report)
+
+    def testAddedPartnerChangesEarlierWords(self):
+        # "either" is only a keyword if "or" follows it anywhere later
+        source = 'Did you know that either is the number 1?\n' \
+                 + 'I said either!\n' * 20
+        parser = IncrementalParser(source)
+        source += 'I said true or false!\n'
+        self.assertRaises(FimParserException, parse, source)
+        self.assertRaises(FimParserException, parser.update, source)
+
+    def testSyntaxErrorKeepsTree(self):
+        parser = IncrementalParser(REPORT)
+        tree = parser.tree
+        with self.assertRaises(FimParserException):
+            parser.update(REPORT.replace('I said count!', 'I said count'))
+        self.assertIs(parser.tree, tree)
+        self.assertEqual(parser.source, REPORT)
+        source = REPORT.replace('I said count!', 'I said count?')
+        self.assertParsedAsWhole(parser.update(source), source)
+
+    def testRandomEdits(self):
+        rng = random.Random(4)
+        for original in (REPORT, SCRIPT, SWITCHES):
+            parser = IncrementalParser(original)
+            source = original
+            for _ in range(50):
+                edited = edit_randomly(source, rng)
+                with self.subTest(source=edited):
+                    try:
+                        tree = parse(edited)
+                    except FimParserException:
+                        self.assertRaises(FimParserException,
+                                          parser.update, edited)
+                        self.assertEqual(parser.source, source)
+                        continue
+                    self.assertEqual(dump(parser.update(edited)), dump(tree))
+                    source = edited
+
+
+if __name__ == '__main__':
+    unittest.main()
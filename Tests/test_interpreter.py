@@ -37,8 +37,10 @@ class InterpreterTests(Base):
         token = Token(Literals.ID, 'a', None, None, None, None)
         expr = fim_ast.Var(token)
         distance = 4
-        self.interpreter.locals[expr] = distance
-        self.interpreter.environment.define(token.value, "Hello World!")
+        self.interpreter.locals[expr] = (distance, 0)
+        self.interpreter.environment = Environment(
+            self.interpreter.environment, ('a',))
+        self.interpreter.environment.slots[0] = "Hello World!"
         for i in range(distance):
             self.interpreter.environment = Environment(
                 self.interpreter.environment)
@@ -56,7 +58,7 @@ class InterpreterTests(Base):
         token = Token(Literals.ID, 'a', None, None, None, None)
         expr = fim_ast.Var(token)
         distance = 4
-        self.interpreter.locals[expr] = distance
+        self.interpreter.locals[expr] = (distance, 0)
 
         function_body = fim_ast.Compound()
         function_body.children.append(
@@ -68,7 +70,9 @@ class InterpreterTests(Base):
         function = FimFunction(
             function_declaration, self.interpreter.environment)
 
-        self.interpreter.environment.define(token.value, function)
+        self.interpreter.environment = Environment(
+            self.interpreter.environment, ('a',))
+        self.interpreter.environment.slots[0] = function
         for i in range(distance):
             self.interpreter.environment = Environment(
                 self.interpreter.environment)
@@ -79,8 +83,10 @@ class InterpreterTests(Base):
         token = Token(Literals.ID, 'a', None, None, None, None)
         expr = fim_ast.Var(token)
         distance = 4
-        self.interpreter.locals[expr] = distance
-        self.interpreter.environment.define(token.value, "Hello World!")
+        self.interpreter.locals[expr] = (distance, 0)
+        self.interpreter.environment = Environment(
+            self.interpreter.environment, ('a',))
+        self.interpreter.environment.slots[0] = "Hello World!"
         for i in range(distance):
             self.interpreter.environment = Environment(
                 self.interpreter.environment)
@@ -241,6 +247,14 @@ class InterpreterTests(Base):
         with self.assertRaises(fim_exception.FimRuntimeException):
             self.interpreter.visit_Class(ast_class)
 
+    def testVisitorsAreFoundOncePerClass(self):
+        node = fim_ast.Number(Token('1', Literals.NUMBER, None, None, None,
+                                    None))
+        self.assertEqual(self.interpreter.visit(node), 1.0)
+        self.assertIs(Interpreter.visitors[fim_ast.Number],
+                      Interpreter.visit_Number)
+        self.assertIsNot(Resolver.visitors, Interpreter.visitors)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,10 @@
+import io
+import mmap
+import tempfile
+import threading
 import unittest
 
-from fim_lexer import Lexer, Token, Keywords, Block, Suffix
+from fim_lexer import Lexer, Token, Keywords, Literals, Block, Suffix
 
 
 class Base(unittest.TestCase):
@@ -31,11 +35,49 @@ class TestLexerInterfaceMethods(Base):
         token = self.lexer.get_next_token()
         print(token)
         self.assertTrue(str(token.type) == 'PRINT' and token.value == 'I said')
-        self.assertTrue(len(self.lexer.tokens) == tokens_len - 1)
+        self.assertTrue(len(self.lexer.tokens) == tokens_len)
+        self.assertTrue(self.lexer.position == 1)
         next_token = self.lexer.get_next_token()
         self.assertTrue(str(next_token.type) == 'STRING'
                         and next_token.value == '"a lot of things"')
 
+    def testGetNextTokenSkipsComments(self):
+        self.lexer.set_source('I said (apples) "a lot of things".')
+        self.lexer.lex()
+        self.lexer.get_next_token()
+        self.assertTrue(str(self.lexer.peek().type) == 'STRING')
+        self.assertTrue(str(self.lexer.get_next_token().type) == 'STRING')
+        self.assertTrue(str(self.lexer.get_next_token().type)
+                        == 'PUNCTUATION')
+        self.assertTrue(str(self.lexer.get_next_token().type) == 'EOF')
+        self.assertTrue(self.lexer.get_next_token().type is None)
+
+    def testLexFileObject(self):
+        self.lexer.set_source(io.StringIO('I said "a lot of things".'))
+        self.assertTrue(self.lexer.source == 'I said "a lot of things".')
+
+    def testLexMemoryMappedFile(self):
+        with tempfile.TemporaryFile() as file:
+            file.write('I said “hello”!'.encode('utf-8'))
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                self.lexer.set_source(m)
+        self.assertTrue(self.lexer.source == 'I said “hello”!')
+
+    def testLexLazily(self):
+        program = 'I said (apples) "a lot of things".\nI said 2!'
+        expected = [(token.value, token.type) for token
+                    in Lexer(program).lex() if token.type != Keywords.COMMENT]
+        self.lexer.set_source(program)
+        self.lexer.lex_lazily()
+        tokens = []
+        while self.lexer.peek().type is not None:
+            tokens.append(self.lexer.get_next_token())
+        self.assertTrue([(token.value, token.type) for token in tokens]
+                        == expected)
+        self.assertTrue(len(self.lexer.tokens) == 0)
+        self.assertTrue(tokens[-2].line == 1)
+
     def testPeek(self):
         self.lexer.set_source('I said "a lot of things".')
         self.lexer.lex()
@@ -84,6 +126,14 @@ class TestLexerInterfaceMethods(Base):
                                        [0, 0, 0, 1, 1, 1, 2],
                                        [0, 7, 8, 0, 7, 8, 0])
 
+    def testLineMapIsBuiltLazily(self):
+        self.lexer.set_source('I said 1!\nI said 2!\n')
+        tokens = self.lexer.lex()
+        line_map = tokens[0].line_map
+        self.assertTrue(line_map._line_starts is None)
+        self.assertTrue((tokens[3].line, tokens[3].column) == (1, 0))
+        self.assertTrue(list(line_map._line_starts) == [0, 10, 20])
+
     def testCrosses(self):
         self.lexer.stack.append(Token('I said', Keywords.PRINT,
                                       Block.NONE, Suffix.NONE, 0, 5))
@@ -609,6 +659,22 @@ class TestOperators(Base):
                            ('NUMBER', '9'),
                            ('PUNCTUATION', '.'))
 
+    def testDivisionWithoutPartner(self):
+        self.assert_tokens('I said divide ' + ', ' * 30 + 'x.',
+                           ('PRINT', 'I said'),
+                           ('ID', 'divide'),
+                           *[('PUNCTUATION', ',')] * 30,
+                           ('ID', 'x'),
+                           ('PUNCTUATION', '.'))
+
+    def testAdditionPartnerOnNextLine(self):
+        self.assert_tokens('I said add 1\nand 2.',
+                           ('PRINT', 'I said'),
+                           ('ID', 'add 1'),
+                           ('AND', 'and'),
+                           ('NUMBER', '2'),
+                           ('PUNCTUATION', '.'))
+
     def testVariableModifier(self):
         self.assert_tokens('Spike’s age is now 11!',
                            ('ID', 'Spike’s age'),
@@ -1035,5 +1101,78 @@ class TestPrograms(Base):
                            ('PUNCTUATION', '.'))
 
 
+class TestScanner(Base):
+    def setUp(self):
+        super().setUp()
+        self.lexer.build_scanners()
+
+    def testMatchLongestFirst(self):
+        scan = self.lexer.keyword_scanner.scan('Spike is now 2.')
+        keywords = scan.match()
+        self.assertEqual([(keyword.value, keyword.type)
+                          for keyword in keywords],
+                         [('is now', Keywords.ASSIGN),
+                          ('is', Keywords.VAR),
+                          ('is', Keywords.EQUAL)])
+        self.assertTrue(all(keyword.start == 6 for keyword in keywords))
+
+    def testMatchFromPosition(self):
+        scan = self.lexer.keyword_scanner.scan('I said 1! I said 2!')
+        keywords = scan.match(9)
+        self.assertEqual(keywords[0].value, 'I said')
+        self.assertEqual(keywords[0].start, 10)
+
+    def testMatchOnlyAtWordStart(self):
+        keywords = self.lexer.keyword_scanner.scan('this').match()
+        self.assertTrue(keywords is None)
+
+    def testMatchLiterals(self):
+        literals = self.lexer.literal_scanner.scan('cake 12 ').match()
+        self.assertEqual(literals[0].value, '12')
+        self.assertEqual(literals[0].type, Literals.NUMBER)
+
+    def testMatchInPlace(self):
+        scan = self.lexer.literal_scanner.scan('cake 12 345', 4, 9)
+        literals = scan.match()
+        self.assertEqual(literals[0].value, '12')
+        self.assertEqual((literals[0].start, literals[0].end), (5, 7))
+        literals = scan.match(7)
+        self.assertEqual(literals[0].value, '3')
+        self.assertTrue(scan.match(9) is None)
+
+
+class TestRepeatedConstruction(Base):
+    program = 'Did you know that Spike’s age is 10?\nI said Spike’s age!'
+
+    def lex(self):
+        return [(token.value, token.type, token.start, token.end)
+                for token in Lexer(self.program).lex()]
+
+    def testReservedWordsAreCompiledOnce(self):
+        regexes = [word.regex for word in Lexer.literals + Lexer.keywords]
+        Lexer(self.program).lex()
+        Lexer(self.program).lex()
+        self.assertTrue(all(
+            regex is word.regex for regex, word
+            in zip(regexes, Lexer.literals + Lexer.keywords)))
+        self.assertTrue(Lexer().keyword_scanner is Lexer().keyword_scanner)
+
+    def testRepeatedConstruction(self):
+        expected = self.lex()
+        for _ in range(100):
+            self.assertTrue(self.lex() == expected)
+
+    def testConstructionInThreads(self):
+        expected = self.lex()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.lex()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(results == [expected] * 8)
+
+
 if __name__ == '__main__':
     unittest.main()
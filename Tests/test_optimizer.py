@@ -0,0 +1,148 @@
+import io
+import sys
+import unittest
+
+import fim_ast
+from fim_exception import FimRuntimeException
+from fim_interpreter import Interpreter
+from fim_lexer import Lexer
+from fim_optimizer import Optimizer
+from fim_parser import Parser
+from fim_resolver import Resolver
+
+
+class Base(unittest.TestCase):
+    def setUp(self):
+        self.old_stdout = sys.stdout
+        sys.stdout = self.buffer = io.StringIO()
+
+    def tearDown(self):
+        sys.stdout = self.old_stdout
+
+    def optimize(self, program):
+        lexer = Lexer(program)
+        lexer.lex()
+        parser = Parser(lexer)
+        tree = parser.parse()
+        self.interpreter = Interpreter(parser)
+        Resolver(self.interpreter).resolve(tree)
+        return Optimizer(self.interpreter.locals).optimize(tree)
+
+    def interpret(self, tree):
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.interpreter.interpret(tree)
+        return self.buffer.getvalue()
+
+
+class ConstantFoldingTests(Base):
+    def assertFolded(self, program, literal_type, printed):
+        tree = self.optimize(program)
+        self.assertIsInstance(tree.children[0].expr, literal_type)
+        self.assertEqual(self.interpret(tree), printed)
+
+    def testArithmetic(self):
+        self.assertFolded('I said add 2 and multiply 3 and 4!', fim_ast.Number,
+                          '14\n')
+        self.assertFolded('I said 7 divided by 2!', fim_ast.Number, '3.5\n')
+
+    def testComparison(self):
+        self.assertFolded('I said 3 is greater than 2!', fim_ast.Bool,
+                          'true\n')
+
+    def testNot(self):
+        self.assertFolded('I said not true!', fim_ast.Bool, 'false\n')
+
+    def testConcatenation(self):
+        self.assertFolded('I said "a" "b"!', fim_ast.String, 'ab\n')
+        self.assertFolded('I said "\'quoted\'" "!"!', fim_ast.String,
+                          "'quoted'!\n")
+
+    def testLine(self):
+        tree = self.optimize('I said "first"!\nI said add 2 and 3!')
+        self.assertEqual(tree.children[1].expr.line, 1)
+
+    def testVariablesAreNotFolded(self):
+        tree = self.optimize('Did you know that a is the number 2?\n'
+                             'I said add a and 3!')
+        self.assertIsInstance(tree.children[1].expr, fim_ast.BinOp)
+        self.assertEqual(self.interpret(tree), '5\n')
+
+    def testArrayElementsAreNotAdded(self):
+        tree = self.optimize('Did you know that cake has words'
+                             ' "a" and "b" and "c"?\nI said cake 0!')
+        self.assertIsInstance(tree.children[0].elements, fim_ast.BinOp)
+        self.assertEqual(self.interpret(tree), 'c\n')
+
+    def testInvalidOperandsFailAtRuntime(self):
+        tree = self.optimize('I said "first"!\nI said 1 plus "Hello".')
+        self.assertIsInstance(tree.children[1].expr, fim_ast.BinOp)
+        with self.assertRaises(FimRuntimeException) as context:
+            self.interpret(tree)
+        self.assertEqual(context.exception.token.line, 1)
+        self.assertEqual(self.buffer.getvalue(), 'first\n')
+
+    def testDivisionByZeroFailsAtRuntime(self):
+        tree = self.optimize('I said 1 divided by 0.')
+        self.assertIsInstance(tree.children[0].expr, fim_ast.BinOp)
+        self.assertRaises(ZeroDivisionError, self.interpret, tree)
+
+
+class DeadCodeTests(Base):
+    def testEmptyStatementsAreRemoved(self):
+        tree = self.optimize('I said "a"!\n!\nI said "b"!')
+        self.assertEqual([type(node) for node in tree.children],
+                         [fim_ast.Print, fim_ast.Print])
+        self.assertEqual(self.interpret(tree), 'a\nb\n')
+
+    def testConstantIf(self):
+        tree = self.optimize('''If 1 is greater than 2 then,
+            I said "then"!
+        Otherwise,
+            I said "otherwise"!
+        That's what I would do.
+        If false then,
+            I said "then"!
+        That's what I would do.
+        If true then,
+            I said "only"!
+        That's what I would do.''')
+        self.assertEqual([type(node) for node in tree.children],
+                         [fim_ast.Print, fim_ast.Print])
+        self.assertEqual(self.interpret(tree), 'otherwise\nonly\n')
+
+    def testConstantLoops(self):
+        tree = self.optimize('''As long as false,
+            I said "while"!
+        That's what I did.
+        Here's what I did:
+            I said "once"!
+        I did this while false.''')
+        self.assertEqual([type(node) for node in tree.children],
+                         [fim_ast.Print])
+        self.assertEqual(self.interpret(tree), 'once\n')
+
+    def testBlockWithResolvedNamesIsKept(self):
+        tree = self.optimize('''I learned how to count.
+            Did you know that a is the number 1?
+            If true then,
+                I said a!
+            That's what I would do.
+        That's all about how to count.
+        I remembered how to count!''')
+        function_body = tree.children[0].body.children
+        self.assertIsInstance(function_body[1], fim_ast.Compound)
+        self.assertEqual(self.interpret(tree), '1\n')
+
+    def testDeclarationsStayInTheirBlock(self):
+        tree = self.optimize('''If true then,
+            Did you know that a is the number 1?
+        That's what I would do.
+        Did you know that a is the number 2?
+        I said a!''')
+        self.assertIsInstance(tree.children[0], fim_ast.Compound)
+        self.assertEqual(self.interpret(tree), '2\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
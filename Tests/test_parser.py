@@ -3,6 +3,7 @@ import unittest
 import fim_ast
 from fim_lexer import Lexer, Literals, Keywords, Token
 from fim_parser import Parser
+from fim_exception import FimParserException
 
 
 class Base(unittest.TestCase):
@@ -36,5 +37,169 @@ class ParserTests(Base):
         self.assertTrue(res.object.token.value == 'Applejack')
 
 
+class ExpressionTests(unittest.TestCase):
+    @staticmethod
+    def parse_expression(expression):
+        lexer = Lexer(f'I said {expression}!')
+        lexer.lex()
+        return Parser(lexer).parse().children[0].expr
+
+    def assertTree(self, node, expected):
+        if isinstance(expected, str):
+            self.assertTrue(isinstance(node, fim_ast.Var))
+            self.assertTrue(node.value == expected)
+        else:
+            operator, left, right = expected
+            self.assertTrue(isinstance(node, fim_ast.BinOp))
+            self.assertTrue(node.op.type == operator)
+            self.assertTree(node.left, left)
+            self.assertTree(node.right, right)
+
+    def testMultiplicationBindsTighterThanAddition(self):
+        self.assertTree(
+            self.parse_expression('a plus b times c'),
+            (Keywords.ADDITION, 'a', (Keywords.MULTIPLICATION, 'b', 'c')))
+
+    def testSameLevelIsLeftAssociative(self):
+        self.assertTree(
+            self.parse_expression('a minus b plus c'),
+            (Keywords.ADDITION, (Keywords.SUBTRACTION, 'a', 'b'), 'c'))
+
+    def testModuloBindsLooserThanAddition(self):
+        self.assertTree(
+            self.parse_expression('a plus b modulo c'),
+            (Keywords.MODULO, (Keywords.ADDITION, 'a', 'b'), 'c'))
+
+    def testComparisonAndLogic(self):
+        self.assertTree(
+            self.parse_expression('a is greater than b or c is d'),
+            (Keywords.OR,
+             (Keywords.GREATER_THAN, 'a', 'b'),
+             (Keywords.EQUAL, 'c', 'd')))
+
+    def testPrefixOperatorWithoutInfix(self):
+        with self.assertRaises(FimParserException) as context:
+            self.parse_expression('add a or b and c')
+        self.assertTrue(context.exception.message ==
+                        'Expected ADDITION or SUBTRACTION operator')
+
+    def testPrefixOperatorEndsTerm(self):
+        self.assertTree(
+            self.parse_expression('add a and b modulo c'),
+            (Keywords.MODULO, (Keywords.ADDITION, 'a', 'b'), 'c'))
+
+
+class StatementTests(unittest.TestCase):
+    @staticmethod
+    def parse_statement(statement):
+        lexer = Lexer(statement)
+        lexer.lex()
+        return Parser(lexer).parse().children[0]
+
+    def testFor(self):
+        node = self.parse_statement(
+            'For every number x from 1 to 5...\nI said x!\n'
+            'That’s what I did.')
+        self.assertTrue(isinstance(node, fim_ast.For))
+
+    def testForIter(self):
+        node = self.parse_statement(
+            'For every character c in word...\nI said c!\n'
+            'That’s what I did.')
+        self.assertTrue(isinstance(node, fim_ast.ForIter))
+
+    def testPostfixIncrement(self):
+        node = self.parse_statement('x got one more.')
+        self.assertTrue(isinstance(node, fim_ast.Increment))
+
+    def testMissingSuperclassName(self):
+        with self.assertRaises(FimParserException) as context:
+            self.parse_statement('Dear : Name!')
+        self.assertTrue(context.exception.message ==
+                        'Expected addressee (superclass) name. '
+                        'try "Princess Celestia"')
+
+    def testUnknownStatementIsEmpty(self):
+        node = self.parse_statement('.')
+        self.assertTrue(isinstance(node, fim_ast.NoOp))
+
+
+class RecoveryTests(unittest.TestCase):
+    program = '''I said 1!
+I said a plus!
+I said 2!
+For every number x from 1 too 3...
+    I said x!
+That’s what I did.
+I said 3 4 5.
+I said 6!'''
+
+    def parse(self, recover):
+        lexer = Lexer(self.program)
+        lexer.lex()
+        parser = Parser(lexer, recover=recover)
+        return parser, parser.parse()
+
+    def testFirstErrorIsRaisedWithoutRecovery(self):
+        with self.assertRaises(FimParserException):
+            self.parse(recover=False)
+
+    def testAllErrorsAreCollected(self):
+        parser, tree = self.parse(recover=True)
+        self.assertTrue([error.token.line for error in parser.errors] ==
+                        [1, 3, 5, 6])
+
+    def testPartialTreeIsReturned(self):
+        parser, tree = self.parse(recover=True)
+        printed = [child.expr.token.value for child in tree.children]
+        self.assertTrue(printed == ['1', '2', 'x', '6'])
+
+    def testErrorsInsideBlocks(self):
+        lexer = Lexer('''While a is 1...
+    I said a plus!
+    I said 1 2.
+    I said 3!
+That’s what I did.''')
+        lexer.lex()
+        parser = Parser(lexer, recover=True)
+        tree = parser.parse()
+        self.assertTrue(len(parser.errors) == 2)
+        self.assertTrue(isinstance(tree.children[0], fim_ast.While))
+        self.assertTrue(len(tree.children[0].body.children) == 1)
+
+
+class NodeTests(unittest.TestCase):
+    def testNodesHaveNoDictionaries(self):
+        node_classes = [cls for cls in vars(fim_ast).values()
+                        if isinstance(cls, type)
+                        and issubclass(cls, fim_ast.AST)]
+        for cls in node_classes:
+            self.assertTrue('__slots__' in vars(cls), cls.__name__)
+
+    def testFields(self):
+        token = Token('a', Literals.ID, None, None, None, None)
+        node = fim_ast.Var(token)
+        self.assertFalse(hasattr(node, '__dict__'))
+        self.assertEqual(list(node.iter_fields()),
+                         [('token', token), ('index', None)])
+
+    def testLiteralValueIsConvertedWhenTokenIsSet(self):
+        node = fim_ast.Number(
+            Token('the number 5', Literals.NUMBER, None, None, None, None))
+        self.assertEqual(node.value, 5.0)
+        node.token = Token('6', Literals.NUMBER, None, None, None, None)
+        self.assertEqual(node.value, 6.0)
+        with self.assertRaises(FimParserException):
+            fim_ast.Number(
+                Token('the number five', Literals.NUMBER, None, None, None,
+                      None))
+        char = fim_ast.Char(
+            Token("'a'", Literals.CHAR, None, None, None, None))
+        self.assertEqual(char.value, 'a')
+        false = fim_ast.Bool(
+            Token('no', Literals.FALSE, None, None, None, None))
+        self.assertIs(false.value, False)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -28,7 +28,8 @@ class Base(unittest.TestCase):
         self.old_stdout = sys.stdout
         sys.stdout = self.buffer = io.StringIO()
         abs_path = Path(path).absolute()
-        pinkiepy.interpret_file(abs_path)
+        # the cache is tested in test_cache, it is kept out of Tests here
+        pinkiepy.interpret_file(abs_path, use_cache=False)
         self.assertTrue(
             expected in self.buffer.getvalue(),
             f'{self.buffer.getvalue()} does not contain {expected}')
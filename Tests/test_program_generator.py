@@ -0,0 +1,43 @@
+import contextlib
+import io
+import unittest
+
+from Benchmarks.program_generator import generate_program, parse_mix
+from fim_interpreter import Interpreter
+from fim_lexer import Lexer
+from fim_parser import Parser
+from fim_resolver import Resolver
+
+
+def interpret(program):
+    lexer = Lexer(program)
+    lexer.lex()
+    parser = Parser(lexer)
+    interpreter = Interpreter(parser)
+    tree = parser.parse()
+    Resolver(interpreter).resolve(tree)
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(tree)
+
+
+class TestProgramGenerator(unittest.TestCase):
+    def testProgramsRun(self):
+        for seed in range(5):
+            interpret(generate_program(200, seed=seed))
+
+    def testLoopHeavyProgramsRun(self):
+        mix = parse_mix('loop=3,arithmetic=1,comment=1,array=1')
+        for seed in range(5):
+            interpret(generate_program(200, mix, seed))
+
+    def testSameSeedGivesSameProgram(self):
+        self.assertTrue(generate_program(100, seed=1) ==
+                        generate_program(100, seed=1))
+
+    def testUnknownStatementKind(self):
+        with self.assertRaises(ValueError):
+            parse_mix('loops=1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import copy
+import operator
 import unittest
 
 import fim_ast
+import fim_interpreter
 from fim_interpreter import Interpreter
 from fim_lexer import Keywords
 from fim_lexer import Lexer
@@ -35,6 +37,18 @@ class ResolverTests(Base):
         self.assertTrue(resolver.interpreter is interpreter)
         self.assertTrue(isinstance(resolver, NodeVisitor))
 
+    def testVisitBinOpSetsOperation(self):
+        lexer = Lexer('I said 1 plus 2 is 3 and not false!\n')
+        lexer.lex()
+        tree = Parser(lexer).parse()
+        self.resolver.resolve(tree)
+        equal = tree.children[0].expr
+        self.assertIs(equal.operation, operator.eq)
+        self.assertIs(equal.left.operation, operator.add)
+        self.assertIs(equal.right.operation,
+                      fim_interpreter.add_or_and)
+        self.assertIs(equal.right.right.operation, operator.not_)
+
     def testVisitCompoundStatement(self):
         compound = fim_ast.Compound()
         compound.children = [fim_ast.NoOp(), fim_ast.NoOp(), fim_ast.NoOp()]
@@ -115,7 +129,7 @@ class ResolverTests(Base):
         self.resolver.scopes[-1]['a'] = True
         node = fim_ast.Var(Token('a', Literals.ID, None, None, None, None))
         self.resolver.visit_Var(node)
-        self.assertTrue(self.interpreter.locals[node] == 0,
+        self.assertTrue(self.interpreter.locals[node] == (0, 0),
                         f'locals[node] is {self.interpreter.locals[node]}')
 
     def testVisitVariableExprGoodBecauseEmpty(self):
@@ -135,7 +149,7 @@ class ResolverTests(Base):
         self.resolver.scopes[-1]['a'] = True
         node = fim_ast.Var(Token('a', Literals.ID, None, None, None, None))
         self.resolver.resolve_local(node, node.token)
-        self.assertTrue(self.interpreter.locals[node] == 0,
+        self.assertTrue(self.interpreter.locals[node] == (0, 0),
                         f'locals[node] is {self.interpreter.locals[node]}')
 
     def testResolveLocalLast3(self):
@@ -144,7 +158,7 @@ class ResolverTests(Base):
         self.resolver.scopes[-1]['a'] = True
         node = fim_ast.Var(Token('a', Literals.ID, None, None, None, None))
         self.resolver.resolve_local(node, node.token)
-        self.assertTrue(self.interpreter.locals[node] == 0,
+        self.assertTrue(self.interpreter.locals[node] == (0, 0),
                         f'locals[node] is {self.interpreter.locals[node]}')
 
     def testResolveLocal2(self):
@@ -153,9 +167,33 @@ class ResolverTests(Base):
         self.resolver.scopes[0]['a'] = True
         node = fim_ast.Var(Token('a', Literals.ID, None, None, None, None))
         self.resolver.resolve_local(node, node.token)
-        self.assertTrue(self.interpreter.locals[node] == 2,
+        self.assertTrue(self.interpreter.locals[node] == (2, 0),
                         f'locals[node] is {self.interpreter.locals[node]}')
 
+    def testSlotsAreInDeclarationOrder(self):
+        lexer = Lexer("""Dear Princess Celestia: Slot Order!
+    Today I learned how to use slots using the number x.
+        Did you know that a is the number 1?
+        Did you know that b is x?
+        I said b!
+    That's all about how to use slots!
+Your faithful student, Rarity.
+""")
+        lexer.lex()
+        tree = Parser(lexer).parse()
+        self.resolver.resolve(tree)
+        method = tree.children[0].methods['how to use slots']
+        declaration, second_declaration, print_statement = \
+            method.body.children
+        self.assertEqual(method.body.names, ('a', 'b'))
+        self.assertEqual(self.interpreter.locals[declaration], (0, 0))
+        self.assertEqual(self.interpreter.locals[second_declaration], (0, 1))
+        # the parameter is in the scope outside the body
+        self.assertEqual(self.interpreter.locals[second_declaration.right],
+                         (1, 0))
+        self.assertEqual(self.interpreter.locals[print_statement.expr],
+                         (0, 1))
+
     def testVisitAssign(self):
         self.resolver._begin_scope()
         self.resolver.visit_VariableDeclaration(fim_ast.VariableDeclaration(
@@ -169,7 +207,7 @@ class ResolverTests(Base):
             fim_ast.String(
                 Token('"a"', Literals.STRING, None, None, None, None)))
         self.resolver.visit_Assign(assign_node)
-        self.assertTrue(self.interpreter.locals[var_node] == 0,
+        self.assertTrue(self.interpreter.locals[var_node] == (0, 0),
                         f'locals[node] is {self.interpreter.locals[var_node]}')
 
     def testFunction(self):
@@ -0,0 +1,120 @@
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import fim_ast
+import fim_serializer
+import pinkiepy
+from fim_exception import FimSerializationException
+from fim_lexer import Token
+from tree_utility import parse, dump
+
+PROGRAM = '''Dear Princess Celestia: Bakery Orders!
+
+    Did you know that flour is the number 1.5?
+
+    I learned how to bake.
+        In regards to flour:
+            On the 1st hoof...
+                I said "muffins".
+            If all else fails...
+                I said "cupcakes".
+        That's what I did.
+        flour got one more.
+    That's all about how to bake.
+
+    Today I learned something.
+        Did you know that orders has many names?
+        orders 1 is "chocolate".
+        I remembered how to bake!
+        I said orders 1!
+    That's all about something!
+
+Your faithful student, Pinkie Pie.
+'''
+
+
+class SerializerTests(unittest.TestCase):
+    def testDumpAndLoad(self):
+        tree = parse(PROGRAM)
+        loaded_tree, source = fim_serializer.loads(
+            fim_serializer.dumps(tree, PROGRAM))
+        self.assertEqual(source, PROGRAM)
+        self.assertEqual(dump(loaded_tree), dump(tree))
+
+    def testSharedNodesStayShared(self):
+        tree, _ = fim_serializer.loads(
+            fim_serializer.dumps(parse(PROGRAM), PROGRAM))
+        report = tree.children[0]
+        self.assertIs(report.methods['something'], report.body.children[2])
+        self.assertIs(report.fields['flour'], report.body.children[0])
+
+    def testValues(self):
+        token = Token('a', 'custom type', None, None, None, None)
+        values = [None, True, False, 0, -5, 2 ** 40, 2 ** 70, 1.5, 'text',
+                  (1, 'a'), {'key': [token]}]
+        tree, _ = fim_serializer.loads(
+            fim_serializer.dumps(fim_ast.Root(values), ''))
+        self.assertEqual(dump(tree.children), dump(values))
+        self.assertIsInstance(tree.children[9], tuple)
+
+    def testFile(self):
+        tree = parse(PROGRAM)
+        compiled_file = io.BytesIO()
+        fim_serializer.dump(tree, PROGRAM, compiled_file)
+        compiled_file.seek(0)
+        loaded_tree, _ = fim_serializer.load(compiled_file)
+        self.assertEqual(dump(loaded_tree), dump(tree))
+
+    def testDamagedData(self):
+        data = fim_serializer.dumps(parse(PROGRAM), PROGRAM)
+        for damaged_data in (b'', b'not a compiled program', data[:-100],
+                             data[:100], data + b'\0'):
+            self.assertRaises(FimSerializationException,
+                              fim_serializer.loads, damaged_data)
+
+    def testOtherVersion(self):
+        data = bytearray(fim_serializer.dumps(parse(PROGRAM), PROGRAM))
+        data[4] += 1
+        with self.assertRaises(FimSerializationException) as context:
+            fim_serializer.loads(bytes(data))
+        self.assertIn('format version', str(context.exception))
+
+
+class CompileTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.program_path = Path(self.directory.name) / 'Hello.fim'
+        self.program_path.write_text('I said "Hello World"!')
+        self.old_stdout = sys.stdout
+        sys.stdout = self.buffer = io.StringIO()
+
+    def tearDown(self):
+        sys.stdout = self.old_stdout
+        self.directory.cleanup()
+
+    def testCompileAndRun(self):
+        self.assertTrue(pinkiepy.compile_file(self.program_path))
+        compiled_path = Path(self.directory.name) / 'Hello.fimc'
+        self.assertTrue(compiled_path.is_file())
+        pinkiepy.interpret_file(compiled_path)
+        self.assertIn('Hello World\n', self.buffer.getvalue())
+
+    def testSyntaxErrorIsNotCompiled(self):
+        self.program_path.write_text('I said "Hello World')
+        self.assertFalse(pinkiepy.compile_file(self.program_path))
+        self.assertIn('FimParserException', self.buffer.getvalue())
+        self.assertEqual(list(Path(self.directory.name).iterdir()),
+                         [self.program_path])
+
+    def testDamagedFile(self):
+        compiled_path = Path(self.directory.name) / 'Hello.fimc'
+        compiled_path.write_bytes(b'FIMC')
+        pinkiepy.interpret_file(compiled_path)
+        self.assertIn('FimSerializationException', self.buffer.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
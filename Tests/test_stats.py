@@ -0,0 +1,62 @@
+import io
+import sys
+import unittest
+
+import pinkiepy
+from fim_stats import collect_stats, count_nodes, format_stats
+from fim_lexer import Lexer
+from fim_parser import Parser
+
+PROGRAM = '''Dear Princess Celestia: Pony Census!
+
+    Did you know that ponies is the number 1?
+
+    Today I learned how to count ponies.
+        I said add ponies and 2!
+    That's all about how to count ponies!
+
+Your faithful student, Applejack.
+'''
+
+
+class StatsTests(unittest.TestCase):
+    def testCountNodes(self):
+        lexer = Lexer(PROGRAM)
+        lexer.lex()
+        counts = count_nodes(Parser(lexer).parse())
+        # methods and fields of a report are also in its body, but are
+        # counted once
+        self.assertEqual(counts['Function'], 1)
+        self.assertEqual(counts['VariableDeclaration'], 1)
+        self.assertEqual(counts['Var'], 3)
+        self.assertEqual(counts['BinOp'], 1)
+        self.assertEqual(counts['Root'], 1)
+
+    def testCollectStats(self):
+        stats = collect_stats(PROGRAM)
+        lexer = Lexer(PROGRAM)
+        self.assertEqual(stats['tokens'], len(lexer.lex()))
+        self.assertEqual(stats['nodes']['Class'], 1)
+        self.assertTrue(stats['peak_memory_bytes'] > 0)
+        for stage in ('lexing', 'parsing', 'resolving'):
+            self.assertTrue(stats[f'{stage}_seconds'] >= 0)
+
+    def testFormatStats(self):
+        text = format_stats(collect_stats(PROGRAM))
+        self.assertIn('tokens', text)
+        self.assertIn('        1 Function', text)
+
+    def testPinkiePyStats(self):
+        old_stdout = sys.stdout
+        sys.stdout = buffer = io.StringIO()
+        try:
+            pinkiepy.stats(io.StringIO(PROGRAM))
+        finally:
+            sys.stdout = old_stdout
+        self.assertIn('Nodes by class:', buffer.getvalue())
+        # the program is not run
+        self.assertNotIn('3\n', buffer.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
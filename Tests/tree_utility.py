@@ -0,0 +1,25 @@
+import fim_ast
+from fim_lexer import Lexer, Token
+from fim_parser import Parser
+
+
+def parse(source):
+    lexer = Lexer(source)
+    lexer.lex_lazily()
+    return Parser(lexer).parse()
+
+
+def dump(node):
+    """Returns the fields of the tree of node and of its tokens as lists
+    and tuples, so that two trees can be compared."""
+    if isinstance(node, Token):
+        return node.value, node.type, node.block, node.suffix, node.start, \
+            node.end, node.line
+    if isinstance(node, fim_ast.AST):
+        return type(node).__name__, [
+            (name, dump(value)) for name, value in node.iter_fields()]
+    if isinstance(node, (list, tuple)):
+        return [dump(item) for item in node]
+    if isinstance(node, dict):
+        return [(dump(key), dump(value)) for key, value in node.items()]
+    return repr(node)
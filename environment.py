@@ -3,9 +3,13 @@ from fim_exception import FimEnvironmentException
 
 
 class Environment:
-    def __init__(self, enclosing=None):
+    def __init__(self, enclosing=None, names=()):
         self.enclosing = None
         self._values = {}
+        # the local variables the resolver found, by their slot, and
+        # their names
+        self.names = names
+        self.slots = [None] * len(names)
         if enclosing is not None:
             self.enclosing = enclosing
 
@@ -43,15 +47,15 @@ class Environment:
     def modify(self, name, relate, value):
         return self.assign(name, relate(self.get(name.value), value))
 
-    def modify_at(self, distance, name, relate, value):
-        return self.assign_at(distance, name,
-                              relate(self.get_at(distance, name.value), value))
+    def modify_at(self, depth, slot, relate, value):
+        slots = self.ancestor(depth).slots
+        slots[slot] = relate(slots[slot], value)
 
-    def get_at(self, distance, name):
-        return self.ancestor(distance).get(name)
+    def get_at(self, depth, slot):
+        return self.ancestor(depth).slots[slot]
 
-    def assign_at(self, distance, token, value):
-        self.ancestor(distance)._values[token.value] = value
+    def assign_at(self, depth, slot, value):
+        self.ancestor(depth).slots[slot] = value
 
     def ancestor(self, distance):
         environment = self
@@ -66,8 +70,10 @@ class Environment:
         return self._values.items()
 
     def __str__(self):
+        items = list(self._values.items())
+        items.extend(zip(self.names, self.slots))
         return "{" + "\n".join("{!r}: {!r},".format(k, v)
-                              for k, v in self._values.items()) + "}"
+                              for k, v in items) + "}"
 
     def str_all(self):
         if self.enclosing is not None:
@@ -1,12 +1,20 @@
 import copy
+from fim_exception import FimParserException
 from fim_lexer import Literals, Token, Keywords, Block, Suffix
 
 
 class AST:
-    pass
+    __slots__ = ()
+
+    def iter_fields(self):
+        """Yields the names and values of the fields of the node."""
+        for name in self.__slots__:
+            yield name, getattr(self, name)
 
 
 class Root(AST):
+    __slots__ = ('children',)
+
     def __init__(self, children):
         self.children = children
 
@@ -16,8 +24,13 @@ class Root(AST):
 
 
 class Compound(AST):
+    __slots__ = ('children', 'names')
+
     def __init__(self):
         self.children = []
+        # set by the resolver to the names of the variables declared in it,
+        # in the order of their slots
+        self.names = ()
 
     @property
     def line(self):
@@ -25,6 +38,8 @@ class Compound(AST):
 
 
 class Assign(AST):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
@@ -35,6 +50,8 @@ class Assign(AST):
 
 
 class Print(AST):
+    __slots__ = ('expr',)
+
     def __init__(self, expr):
         self.expr = expr
 
@@ -44,8 +61,12 @@ class Print(AST):
 
 
 class Var(AST):
+    __slots__ = ('token', 'index')
+
     def __init__(self, token):
         self.token = token
+        # set by the resolver if the name is an element of an array
+        self.index = None
 
     @property
     def value(self):
@@ -60,10 +81,14 @@ class Var(AST):
 
 
 class BinOp(AST):
+    __slots__ = ('left', 'token', 'op', 'right', 'operation')
+
     def __init__(self, left, op, right):
         self.left = left
         self.token = self.op = op
         self.right = right
+        # set by the resolver to the function that performs op
+        self.operation = None
 
     @property
     def line(self):
@@ -71,95 +96,114 @@ class BinOp(AST):
 
 
 class UnaryOp(AST):
+    __slots__ = ('token', 'op', 'expr', 'operation')
+
     def __init__(self, op, expr):
         self.token = self.op = op
         self.expr = expr
+        # set by the resolver to the function that performs op
+        self.operation = None
 
     @property
     def line(self):
         return self.expr.line
 
 
-class Number(AST):
+class Literal(AST):
+    """A node whose value is found from its token once, when the token is
+    set, instead of every time the node is evaluated."""
+    __slots__ = ()
+
     def __init__(self, token):
         self.token = token
 
     @property
-    def value(self):
-        return self.token.value
+    def token(self):
+        return self._token
+
+    @token.setter
+    def token(self, token):
+        self._token = token
+        self.value = self.convert(token)
 
     @property
     def line(self):
         return self.token.line
 
 
-class Char(AST):
-    def __init__(self, token):
-        self.token = token
+class Number(Literal):
+    __slots__ = ('_token', 'value')
 
-    @property
-    def value(self):
-        if self.token.value[0] == "'" and self.token.value[-1] == "'":
-            return self.token.value[1:-1]
-        return self.token.value
+    @staticmethod
+    def convert(token):
+        if token.type != Literals.NUMBER:
+            # a name typed as a number, which the resolver looks up
+            return None
+        # the type before the number is only taken off the token by the
+        # resolver
+        try:
+            return float(str(token.value).rpartition(' ')[2])
+        except ValueError:
+            raise FimParserException(
+                token, f'{token.value} is not a number') from None
 
-    @property
-    def line(self):
-        return self.token.line
 
+class Char(Literal):
+    __slots__ = ('_token', 'value')
 
-class Bool(AST):
-    def __init__(self, token):
-        self.token = token
+    @staticmethod
+    def convert(token):
+        if token.value[0] == "'" and token.value[-1] == "'":
+            return token.value[1:-1]
+        return token.value
 
-    @property
-    def value(self):
-        if self.token.type == Literals.TRUE:
+
+class Bool(Literal):
+    __slots__ = ('_token', 'value')
+
+    @staticmethod
+    def convert(token):
+        if token.type == Literals.TRUE:
             return True
-        elif self.token.type == Literals.FALSE:
+        elif token.type == Literals.FALSE:
             return False
         else:
-            raise NameError(repr(self.token.type))
+            raise NameError(repr(token.type))
 
-    @property
-    def line(self):
-        return self.token.line
 
+class Null(Literal):
+    __slots__ = ('_token', 'value')
 
-class Null(AST):
-    def __init__(self, token):
-        self.token = token
-        self.value = None
-
-    @property
-    def line(self):
-        return self.token.line
+    @staticmethod
+    def convert(token):
+        return None
 
 
-class String(AST):
-    def __init__(self, token):
-        self.token = token
+class String(Literal):
+    __slots__ = ('_token', 'value')
 
-    @property
-    def value(self):
-        if self.token.value[0] in ['"', '”', '“'] \
-                and self.token.value[-1] in ['"', '”', '“']:
-            return self.token.value[1:-1]
-        return self.token.value
+    @staticmethod
+    def convert(token):
+        return String.unquote(token.value)
 
-    @property
-    def line(self):
-        return self.token.line
+    @staticmethod
+    def unquote(text):
+        if text[0] in ['"', '”', '“'] and text[-1] in ['"', '”', '“']:
+            return text[1:-1]
+        return text
 
     def __iter__(self):
         return iter(self.value)
 
 
 class NoOp(AST):
-    pass
+    __slots__ = ()
 
 
 class Class(AST):
+    __slots__ = ('name', 'superclass', 'implementations', 'body', 'methods',
+                 'fields', 'programmer')
+
     def __init__(self,
                  name,
                  superclass,
@@ -185,6 +229,8 @@ class Class(AST):
 
 
 class Interface(AST):
+    __slots__ = ('name', 'methods', 'programmer')
+
     def __init__(self, name, methods, programmer):
         self.name = name
         self.methods = methods
@@ -199,6 +245,8 @@ class Interface(AST):
 
 
 class Get(AST):
+    __slots__ = ('object', 'name', 'has_parameters')
+
     def __init__(self, object, name, has_parameters):
         self.object = object
         self.name = name
@@ -214,6 +262,8 @@ class Get(AST):
 
 
 class Set(AST):
+    __slots__ = ('object', 'name', 'value')
+
     def __init__(self, object, name, value):
         self.object = object
         self.name = name
@@ -225,6 +275,9 @@ class Set(AST):
 
 
 class Function(AST):
+    __slots__ = ('token', 'name', 'return_type', 'params', 'body', 'is_main',
+                 'is_class_method')
+
     def __init__(self, name, return_type, params, body, is_main):
         self.token = name
         self.name = name
@@ -232,6 +285,7 @@ class Function(AST):
         self.params = params
         self.body = body
         self.is_main = is_main
+        self.is_class_method = False
 
     @property
     def line(self):
@@ -239,6 +293,8 @@ class Function(AST):
 
 
 class Return(AST):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
@@ -248,6 +304,8 @@ class Return(AST):
 
 
 class FunctionCall(AST):
+    __slots__ = ('name', 'arguments')
+
     def __init__(self, name, arguments):
         self.name = name
         self.arguments = arguments
@@ -258,6 +316,8 @@ class FunctionCall(AST):
 
 
 class Read(AST):
+    __slots__ = ('variable',)
+
     def __init__(self, variable):
         self.variable = variable
 
@@ -267,6 +327,8 @@ class Read(AST):
 
 
 class Prompt(AST):
+    __slots__ = ('read_node', 'expr')
+
     def __init__(self, read_node, expr):
         self.read_node = read_node
         self.expr = expr
@@ -277,6 +339,8 @@ class Prompt(AST):
 
 
 class VariableDeclaration(AST):
+    __slots__ = ('left', 'token', 'op', 'right', 'is_const')
+
     def __init__(self, left, op, right, is_const=False):
         self.left = left
         self.token = self.op = op
@@ -289,6 +353,8 @@ class VariableDeclaration(AST):
 
 
 class Increment(AST):
+    __slots__ = ('variable', 'value')
+
     def __init__(self, variable, value=1):
         self.variable = variable
         self.value = value
@@ -299,6 +365,8 @@ class Increment(AST):
 
 
 class Decrement(AST):
+    __slots__ = ('variable',)
+
     def __init__(self, variable):
         self.variable = variable
 
@@ -308,6 +376,8 @@ class Decrement(AST):
 
 
 class If(AST):
+    __slots__ = ('condition', 'then_branch', 'else_branch')
+
     def __init__(self, condition, then_branch, else_branch):
         self.condition = condition
         self.then_branch = then_branch
@@ -319,6 +389,8 @@ class If(AST):
 
 
 class Switch(AST):
+    __slots__ = ('variable', 'cases', 'default')
+
     def __init__(self, variable, cases, default):
         self.variable = variable
         self.cases = cases
@@ -330,6 +402,8 @@ class Switch(AST):
 
 
 class While(AST):
+    __slots__ = ('condition', 'body')
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
@@ -340,6 +414,8 @@ class While(AST):
 
 
 class DoWhile(AST):
+    __slots__ = ('condition', 'body')
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
@@ -350,6 +426,8 @@ class DoWhile(AST):
 
 
 class Import(AST):
+    __slots__ = ('name',)
+
     def __init__(self, name):
         self.name = name
 
@@ -359,6 +437,8 @@ class Import(AST):
 
 
 class Array(AST):
+    __slots__ = ('name', 'type', 'elements')
+
     def __init__(self, name, type, elements=None):
         self.name = name
         self.type = type
@@ -370,6 +450,8 @@ class Array(AST):
 
 
 class ArrayElementAssignment(AST):
+    __slots__ = ('left', 'index', 'right')
+
     def __init__(self, left, index, right):
         self.left = left
         self.index = index
@@ -385,6 +467,8 @@ class ArrayElementAssignment(AST):
 
 
 class ArrayElement(AST):
+    __slots__ = ('name', 'index')
+
     def __init__(self, name, index):
         self.name = name
         self.index = index
@@ -395,6 +479,8 @@ class ArrayElement(AST):
 
 
 class For(AST):
+    __slots__ = ('init', 'to_value', 'body', 'condition', 'token')
+
     def __init__(self, init, to_value, body):
         self.init = init
         self.to_value = to_value
@@ -406,6 +492,7 @@ class For(AST):
                   Block.NONE, Suffix.NONE,
                   self.to_value.token.start, self.to_value.token.end),
             self.to_value)
+        self.token = None
 
     @property
     def line(self):
@@ -413,10 +500,13 @@ class For(AST):
 
 
 class ForIter(AST):
+    __slots__ = ('init', 'iterable', 'body', 'token')
+
     def __init__(self, init, iterable, body):
         self.init = init
         self.iterable = iterable
         self.body = body
+        self.token = None
 
     @property
     def line(self):
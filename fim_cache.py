@@ -0,0 +1,78 @@
+import glob
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import fim_ast
+import fim_lexer
+import fim_parser
+import fim_serializer
+import special_words
+import utility
+from fim_exception import FimSerializationException
+
+CACHE_DIRECTORY_NAME = '__fimcache__'
+CACHE_FILE_SUFFIX = special_words.compiled_extension
+# entries were pickled before, they are removed like stale ones
+OLD_CACHE_FILE_SUFFIXES = ('.pickle',)
+
+
+def _get_interpreter_version():
+    # any change to the code that builds the tree makes old trees stale
+    version = hashlib.sha256(sys.version.encode())
+    for module in (fim_lexer, fim_parser, fim_ast, fim_serializer,
+                   special_words, utility):
+        version.update(Path(module.__file__).read_bytes())
+    return version.hexdigest()
+
+
+class TreeCache:
+    """Keeps parsed programs in a __fimcache__ directory next to them,
+    keyed by the program text and the interpreter version.
+
+    Entries are in the .fimc format, which only creates node classes and
+    plain values, so a planted entry cannot run code when it is loaded."""
+
+    interpreter_version = None
+
+    def __init__(self, program_path):
+        program_path = Path(program_path)
+        self.directory = program_path.parent / CACHE_DIRECTORY_NAME
+        self.program_name = program_path.name
+        if TreeCache.interpreter_version is None:
+            TreeCache.interpreter_version = _get_interpreter_version()
+
+    def get_path(self, source):
+        key = hashlib.sha256(self.interpreter_version.encode())
+        key.update(source.encode())
+        return self.directory / \
+            f'{self.program_name}.{key.hexdigest()[:32]}{CACHE_FILE_SUFFIX}'
+
+    def load(self, source):
+        try:
+            with self.get_path(source).open('rb') as cache_file:
+                tree, cached_source = fim_serializer.load(cache_file)
+        except (OSError, FimSerializationException, TypeError):
+            return None
+        if cached_source != source or not isinstance(tree, fim_ast.Root):
+            return None
+        return tree
+
+    def save(self, source, tree):
+        path = self.get_path(source)
+        temporary_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        try:
+            self.directory.mkdir(exist_ok=True)
+            self._remove_stale_entries()
+            with temporary_path.open('wb') as cache_file:
+                fim_serializer.dump(tree, source, cache_file)
+            os.replace(temporary_path, path)
+        except (OSError, TypeError, ValueError):
+            temporary_path.unlink(missing_ok=True)
+
+    def _remove_stale_entries(self):
+        for suffix in (CACHE_FILE_SUFFIX,) + OLD_CACHE_FILE_SUFFIXES:
+            pattern = f'{glob.escape(self.program_name)}.*{suffix}'
+            for stale_path in self.directory.glob(pattern):
+                stale_path.unlink(missing_ok=True)
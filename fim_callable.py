@@ -21,12 +21,16 @@ class FimFunction(FimCallable):
         return f"<function {self.declaration.name}>"
 
     def call(self, interpreter, arguments):
-        environment = Environment(self.closure)
-        for i in range(len(self.declaration.params)):
-            environment.define(self.declaration.params[i].value, arguments[i])
+        # the resolver gives the parameters the first slots
+        declaration = self.declaration
+        environment = Environment(
+            self.closure,
+            tuple(parameter.value for parameter in declaration.params))
+        environment.slots = list(arguments)
+        body = declaration.body
         try:
-            interpreter.execute_compound(self.declaration.body.children,
-                                         Environment(environment))
+            interpreter.execute_compound(
+                body.children, Environment(environment, body.names))
         except FimReturn as return_value:
             return return_value.value
         return None
@@ -35,7 +39,10 @@ class FimFunction(FimCallable):
         return len(self.declaration.params)
 
     def bind(self, instance):
-        environment = Environment(self.closure)
+        # this report has the only slot of a class's scope, and is also
+        # found by name for variables the resolver did not find
+        environment = Environment(self.closure, (special_words.this,))
+        environment.slots[0] = instance
         environment.define(special_words.this, instance)
         return FimFunction(self.declaration, environment)
 
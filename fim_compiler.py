@@ -0,0 +1,411 @@
+import operator
+
+import fim_ast
+import special_words
+import utility
+from environment import Environment
+from fim_callable import FimCallable, FimFunction, FimReturn
+from fim_exception import FimRuntimeException
+from fim_interpreter import Interpreter, BINARY_OPERATIONS, \
+    UNARY_OPERATIONS, stringify
+
+
+class CompilingInterpreter(Interpreter):
+    """Compiles every node of a resolved tree once into a closure that
+    runs it, with the closures of its operands captured, instead of
+    visiting the node every time it runs.
+
+    A closure does what the visit method of Interpreter does for its node.
+    Nodes that are seldom run are compiled into a call of that method."""
+
+    def __init__(self, parser):
+        super().__init__(parser)
+        self.code = {}
+        self.blocks = {}
+
+    def visit(self, node):
+        return self.compile(node)()
+
+    def compile(self, node):
+        code = self.code.get(node)
+        if code is None:
+            compiler = getattr(self, 'compile_' + type(node).__name__,
+                               self.compile_visit)
+            code = self.code[node] = compiler(node)
+        return code
+
+    def compile_visit(self, node):
+        visitor = getattr(self, 'visit_' + type(node).__name__,
+                          self.generic_visit)
+        return lambda: visitor(node)
+
+    def compile_block(self, statements):
+        # the list is kept so that its id is not reused
+        block = self.blocks.get(id(statements))
+        if block is None:
+            block = self.blocks[id(statements)] = \
+                statements, tuple(map(self.compile, statements))
+        return block[1]
+
+    def execute_compound(self, statements, environment):
+        code = self.compile_block(statements)
+        previous_env = self.environment
+        try:
+            self.environment = environment
+            for statement in code:
+                statement()
+        finally:
+            self.environment = previous_env
+
+    def compile_Root(self, node):
+        code = tuple(self.compile(declaration)
+                     for declaration in node.children
+                     if not isinstance(declaration, fim_ast.Class))
+
+        def run():
+            for declaration in code:
+                declaration()
+
+        return run
+
+    def compile_Compound(self, node):
+        code = self.compile_block(node.children)
+        names = node.names
+
+        def run():
+            previous_env = self.environment
+            self.environment = Environment(previous_env, names)
+            try:
+                for statement in code:
+                    statement()
+            finally:
+                self.environment = previous_env
+
+        return run
+
+    def compile_literal(self, node):
+        value = node.value
+        return lambda: value
+
+    compile_Number = compile_String = compile_Char = compile_Bool = \
+        compile_Null = compile_literal
+
+    def compile_NoOp(self, node):
+        return lambda: None
+
+    def compile_lookup(self, node):
+        """Returns a closure that looks the variable up, see
+        Interpreter.lookup_variable."""
+        token = node.token
+        location = self.locals.get(node)
+        if location is None:
+            return lambda: self.lookup_outside_scopes(token)
+        depth, slot = location
+        if depth == 0:
+            return lambda: self.environment.slots[slot]
+        if depth == 1:
+            return lambda: self.environment.enclosing.slots[slot]
+        return lambda: self.environment.get_at(depth, slot)
+
+    def compile_store(self, location):
+        """Returns a function that sets the variable at location, see
+        Interpreter.resolve."""
+        depth, slot = location
+        if depth == 0:
+            def store(value):
+                self.environment.slots[slot] = value
+        elif depth == 1:
+            def store(value):
+                self.environment.enclosing.slots[slot] = value
+        else:
+            def store(value):
+                self.environment.assign_at(depth, slot, value)
+        return store
+
+    def find_instance(self):
+        """Returns the instance whose method is running or None, without
+        raising an exception outside methods, as Environment.get does."""
+        environment = self.environment
+        while environment is not None:
+            if special_words.this in environment:
+                return environment.get(special_words.this)
+            environment = environment.enclosing
+        return None
+
+    def lookup_outside_scopes(self, token):
+        instance = self.find_instance()
+        if instance is not None:
+            try:
+                return instance.get(token)
+            except FimRuntimeException:
+                pass
+        return self.globals.get(token.value)
+
+    def compile_Var(self, node):
+        lookup = self.compile_lookup(node)
+        if node.index is not None:
+            return self.compile_element(node, lookup)
+
+        def run():
+            value = lookup()
+            if isinstance(value, FimCallable) and value.arity() == 0:
+                return value.call(self, [])
+            return value
+
+        return run
+
+    def compile_element(self, node, lookup):
+        if not utility.is_float_and_int(node.index):
+            def fail():
+                lookup()
+                raise FimRuntimeException(
+                    node.token, f"index {node.index} must be an integer")
+
+            return fail
+        index = int(node.index)
+        return lambda: lookup().elements[index]
+
+    def compile_assignment(self, variable):
+        """Returns a function that assigns to the variable, see
+        Interpreter.visit_Assign."""
+        location = self.locals.get(variable)
+        if location is not None:
+            return self.compile_store(location)
+
+        def assign_outside_scopes(value):
+            instance = self.find_instance()
+            if instance is not None:
+                try:
+                    instance.set(variable, value)
+                    return
+                except FimRuntimeException:
+                    pass
+            self.globals.assign(variable, value)
+
+        return assign_outside_scopes
+
+    def compile_Assign(self, node):
+        right = self.compile(node.right)
+        assign = self.compile_assignment(node.left)
+
+        def run():
+            value = right()
+            assign(value)
+            return value
+
+        return run
+
+    def compile_Read(self, node):
+        assign = self.compile_assignment(node.variable)
+
+        def run():
+            assign(fim_ast.String.unquote(input()))
+
+        return run
+
+    def compile_VariableDeclaration(self, node):
+        name = node.left.value
+        right = self.compile(node.right)
+        location = self.locals.get(node)
+        if location is None:
+            return lambda: self.environment.define(name, right())
+        store = self.compile_store(location)
+        return lambda: store(right())
+
+    def compile_BinOp(self, node):
+        operation = node.operation or BINARY_OPERATIONS.get(node.op.type)
+        if operation is None:
+            return self.compile_visit(node)
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+        op = node.op
+
+        def run():
+            left_value = left()
+            right_value = right()
+            try:
+                return operation(left_value, right_value)
+            except TypeError:
+                raise FimRuntimeException(
+                    op,
+                    f'Cannot perform operation {op.value}'
+                    f' with {stringify(left_value)}'
+                    f' and {stringify(right_value)}')
+
+        return run
+
+    def compile_UnaryOp(self, node):
+        operation = node.operation or UNARY_OPERATIONS.get(node.op.type)
+        if operation is None:
+            return lambda: None
+        expr = self.compile(node.expr)
+        return lambda: operation(expr())
+
+    def compile_If(self, node):
+        condition = self.compile(node.condition)
+        then_branch = self.compile(node.then_branch)
+        if node.else_branch is None:
+            def run():
+                if condition():
+                    then_branch()
+
+            return run
+        else_branch = self.compile(node.else_branch)
+
+        def run_with_else():
+            if condition():
+                then_branch()
+            else:
+                else_branch()
+
+        return run_with_else
+
+    def compile_While(self, node):
+        condition = self.compile(node.condition)
+        body = self.compile(node.body)
+
+        def run():
+            while condition():
+                body()
+
+        return run
+
+    def compile_DoWhile(self, node):
+        condition = self.compile(node.condition)
+        body = self.compile(node.body)
+
+        def run():
+            while True:
+                body()
+                if not condition():
+                    break
+
+        return run
+
+    def compile_For(self, node):
+        init = self.compile(node.init)
+        condition = self.compile(node.condition)
+        body = self.compile(node.body)
+        if not isinstance(node.to_value, fim_ast.Number):
+            def run():
+                init()
+                while condition():
+                    body()
+
+            return run
+
+        lookup = self.compile_lookup(node.condition.left)
+        to_value = self.compile(node.to_value)
+
+        def run_to_number():
+            init()
+            last_value = to_value()
+            while True:
+                value = lookup()
+                if type(value) is float:
+                    if not value <= last_value:
+                        break
+                elif not condition():
+                    break
+                body()
+
+        return run_to_number
+
+    def compile_ForIter(self, node):
+        init = self.compile(node.init)
+        iterable = self.compile(node.iterable)
+        body = self.compile(node.body)
+        variable = node.init.left
+        location = self.locals.get(node.init)
+        if location is None:
+            def store(value):
+                self.environment.assign(variable, value)
+        else:
+            store = self.compile_store(location)
+
+        def run():
+            init()
+            for value in iter(iterable()):
+                store(value)
+                body()
+
+        return run
+
+    def compile_Print(self, node):
+        expr = self.compile(node.expr)
+        return lambda: print(stringify(expr()))
+
+    def compile_Return(self, node):
+        if node.value is None:
+            def run():
+                raise FimReturn(None)
+
+            return run
+        value = self.compile(node.value)
+
+        def run_with_value():
+            raise FimReturn(value())
+
+        return run_with_value
+
+    def compile_Increment(self, node):
+        if isinstance(node.value, int):
+            step = node.value
+
+            def value():
+                return step
+        else:
+            value = self.compile(node.value)
+        return self.compile_modification(node.variable, operator.add, value)
+
+    def compile_Decrement(self, node):
+        return self.compile_modification(node.variable, operator.sub,
+                                         lambda: 1)
+
+    def compile_modification(self, variable, relate, value):
+        location = self.locals.get(variable)
+        if location is None:
+            token = variable.token
+            return lambda: self.environment.modify(token, relate, value())
+        depth, slot = location
+        if depth != 0:
+            return lambda: self.environment.modify_at(depth, slot, relate,
+                                                      value())
+
+        def run():
+            slots = self.environment.slots
+            slots[slot] = relate(slots[slot], value())
+
+        return run
+
+    def compile_FunctionCall(self, node):
+        name = self.compile(node.name)
+        arguments = tuple(map(self.compile, node.arguments))
+
+        def run():
+            function = name()
+            values = [argument() for argument in arguments]
+            if len(values) != function.arity():
+                raise FimRuntimeException(
+                    node.name,
+                    f"Function '{node}' expected {function.arity()}"
+                    f" arguments, got {len(values)}")
+            if isinstance(function, FimCallable):
+                return function.call(self, values)
+            raise FimRuntimeException(node.name,
+                                      f"{node} is not a function")
+
+        return run
+
+    def compile_Function(self, node):
+        self.compile_block(node.body.children)
+        location = self.locals.get(node)
+        if location is None:
+            return self.compile_visit(node)
+        store = self.compile_store(location)
+        return lambda: store(FimFunction(node, self.environment))
+
+    def compile_Class(self, node):
+        for method in node.methods.values():
+            self.compile_block(method.body.children)
+        return self.compile_visit(node)
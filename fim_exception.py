@@ -26,3 +26,11 @@ class FimEnvironmentException(FimRuntimeException):
 
     def __str__(self):
         return f'{self.message}'
+
+
+class FimSerializationException(FimException):
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return f'{self.message}'
@@ -0,0 +1,290 @@
+import re
+
+import fim_ast
+from fim_lexer import Lexer, Token, Keywords, Block
+from fim_parser import Parser
+
+# sources are compared in chunks first, which is much faster than
+# comparing them character by character
+COMPARED_CHUNK_SIZE = 4096
+
+
+class IncrementalParser:
+    """Keeps the tree of a program up to date while its source is edited.
+
+    After an edit, lexing and parsing start over from the end of the last
+    top-level declaration, or report (class) member, that the edit cannot
+    have changed, and stop as soon as they are back in step with the
+    previous source. The rest of the previous tree is kept, with its
+    tokens moved along with the edit, so only the latest tree should be
+    used."""
+
+    def __init__(self, source):
+        Lexer.build_scanners()
+        self.lookbehind = max(Lexer.keyword_scanner.lookbehind,
+                              Lexer.literal_scanner.lookbehind)
+        lexer = Lexer(source)
+        boundaries = {}
+        spans = {}
+        lexer.lex_lazily(boundaries=boundaries)
+        parser = Parser(lexer, spans=spans)
+        self.tree = parser.parse()
+        self.source = source
+        # all tokens from one lexer share a line map, moved tokens keep it
+        self._line_map = parser.current_token.line_map
+        # spans of the top-level declarations and the report members,
+        # and the horizons of those that the lexer can start after
+        self._spans = {}
+        self._boundaries = {}
+        # where the members of each report start
+        self._body_starts = {}
+        self._add_members(self.tree.children, spans, boundaries,
+                          (0, frozenset()))
+
+    def update(self, source):
+        """Parses the edited source and returns its tree. A syntax error is
+        raised the same way Parser.parse raises it, and the previous tree
+        is kept then."""
+        if source == self.source:
+            return self.tree
+        start = _get_common_prefix_length(self.source, source)
+        suffix = _get_common_suffix_length(
+            self.source, source, min(len(self.source), len(source)) - start)
+        edit = _Edit(start, len(self.source) - suffix, len(source) - suffix)
+
+        report = self._find_report(start)
+        if report is None \
+                or not self._reparse(source, edit, report.body.children,
+                                     report):
+            self._reparse(source, edit, self.tree.children)
+        self.source = source
+        return self.tree
+
+    def _find_report(self, position):
+        for member in self.tree.children:
+            if isinstance(member, fim_ast.Class) \
+                    and self._spans[member][0] < position \
+                    < self._spans[member][1]:
+                return member
+        return None
+
+    def _reparse(self, source, edit, members, report=None):
+        """Parses the members around the edit again, returns False if that
+        cannot be done inside the report."""
+        restart = self._get_restart(members, report, edit, source)
+        if restart is None:
+            return False
+        lexer = Lexer(source)
+        boundaries = {}
+        spans = {}
+        lexer.lex_lazily(restart, boundaries)
+        parser = Parser(lexer, spans=spans)
+        member_indices = {self._spans[member][1]: index
+                          for index, member in enumerate(members)
+                          if member in self._spans}
+        new_members = []
+        while True:
+            token = parser.current_token
+            if token.type == 'EOF':
+                if report is not None:
+                    return False
+                end = old_end = len(self.source)
+                later_index = len(members)
+                break
+            if report is not None and token.type == Keywords.REPORT \
+                    and token.block == Block.END:
+                return False
+            if report is None:
+                parser.add_declaration(new_members)
+            else:
+                parser.add_statement(new_members)
+            end = spans[new_members[-1]][1]
+            old_end = end - edit.delta
+            # the lexer looks back a few characters, so they must not
+            # have changed either
+            if end >= edit.new_end and end in boundaries \
+                    and old_end in member_indices \
+                    and old_end in self._boundaries \
+                    and source[max(0, end - self.lookbehind):end] \
+                    == self.source[max(0, old_end - self.lookbehind):old_end]:
+                later_index = member_indices[old_end] + 1
+                break
+
+        kept_index = 0 if restart not in member_indices \
+            else member_indices[restart] + 1
+        later_members = members[later_index:]
+        # everything lexed after the restart depends on what was read
+        # before it too
+        start_horizon = self._boundaries.get(restart, (0, frozenset()))
+        self._move_spans(restart, old_end, edit.delta)
+        self._move_boundaries(restart, old_end, edit.delta, _join_horizons(
+            boundaries.get(end, (len(source) + 1, frozenset())),
+            start_horizon))
+        self._add_members(new_members, spans, boundaries, start_horizon,
+                          source)
+        self._line_map.set_source(source)
+        _move_tokens(new_members, 0, self._line_map)
+
+        members = members[:kept_index] + new_members + later_members
+        if report is None:
+            later_nodes = later_members
+            self.tree = fim_ast.Root(members)
+        else:
+            report.body.children = members
+            report.methods, report.fields = \
+                Parser._divide_methods_from_fields(report.body)
+            later_nodes = later_members + [report.programmer] \
+                + self.tree.children[self.tree.children.index(report) + 1:]
+        if edit.delta != 0:
+            _move_tokens(later_nodes, edit.delta, self._line_map)
+        return True
+
+    def _get_restart(self, members, report, edit, source):
+        # the lexer and the parser can start over after a member if the
+        # source read to lex it is the same
+        for member in reversed(members):
+            end = self._spans.get(member, (None, edit.start + 1))[1]
+            if end <= edit.start and end in self._boundaries \
+                    and _is_unchanged(self._boundaries[end], edit, source):
+                return end
+        if report is None:
+            return 0
+        body_start = self._body_starts.get(report)
+        if body_start is not None \
+                and _is_unchanged(self._boundaries[body_start], edit, source):
+            return body_start
+        return None
+
+    def _move_spans(self, start, end, delta):
+        # members between start and end are parsed again, the ones after
+        # end move, and so does the end of a report around them
+        spans = {}
+        for member, (member_start, member_end) in self._spans.items():
+            if member_end <= start:
+                spans[member] = (member_start, member_end)
+            elif member_start < start:
+                spans[member] = (member_start, member_end + delta)
+            elif member_start >= end:
+                spans[member] = (member_start + delta, member_end + delta)
+        self._spans = spans
+        self._body_starts = {
+            report: body_start if body_start <= start else body_start + delta
+            for report, body_start in self._body_starts.items()
+            if body_start <= start or body_start > end}
+
+    def _move_boundaries(self, start, end, delta, end_horizon):
+        boundaries = {}
+        for position, horizon in self._boundaries.items():
+            if position <= start:
+                boundaries[position] = horizon
+            elif position > end:
+                boundaries[position + delta] = _join_horizons(
+                    (horizon[0] + delta, horizon[1]), end_horizon)
+        self._boundaries = boundaries
+
+    def _add_members(self, members, spans, boundaries, start_horizon,
+                     source=None):
+        source = self.source if source is None else source
+        for member in members:
+            self._add_member(member, spans, boundaries, start_horizon)
+            if not isinstance(member, fim_ast.Class):
+                continue
+            for body_member in member.body.children:
+                self._add_member(body_member, spans, boundaries,
+                                 start_horizon)
+            # the report name is followed by punctuation
+            body_start = re.compile(Lexer.punctuation_pattern).match(
+                source, member.name.end)
+            if body_start is not None and body_start.end() in boundaries:
+                self._body_starts[member] = body_start.end()
+                self._boundaries[body_start.end()] = _join_horizons(
+                    boundaries[body_start.end()], start_horizon)
+
+    def _add_member(self, member, spans, boundaries, start_horizon):
+        # some statements that are not understood are parsed into None,
+        # the members around them can still be reused
+        if member is None:
+            return
+        self._spans[member] = spans[member]
+        end = spans[member][1]
+        if end in boundaries:
+            self._boundaries[end] = _join_horizons(boundaries[end],
+                                                   start_horizon)
+
+
+class _Edit:
+    def __init__(self, start, old_end, new_end):
+        self.start = start
+        self.old_end = old_end
+        self.new_end = new_end
+        self.delta = new_end - old_end
+
+
+def _join_horizons(first, second):
+    return max(first[0], second[0]), first[1] | second[1]
+
+
+def _is_unchanged(horizon, edit, source):
+    """Returns whether the lexer reads the same before the horizon of
+    a boundary after the edit."""
+    end, missing_words = horizon
+    return end <= edit.start and not any(
+        word in source[max(0, edit.start - len(word) + 1):
+                       edit.new_end + len(word) - 1]
+        for word in missing_words)
+
+
+def _move_tokens(nodes, delta, line_map):
+    """Moves the tokens in the trees of nodes by delta and maps their
+    lines with line_map."""
+    visited = set()
+    items = list(nodes)
+    while len(items) != 0:
+        item = items.pop()
+        if isinstance(item, Token):
+            if item in visited:
+                continue
+            visited.add(item)
+            if item.start is not None:
+                item.start += delta
+                item.end += delta
+            if item.line_map is not None:
+                item.line_map = line_map
+        elif isinstance(item, fim_ast.AST):
+            if item in visited:
+                continue
+            visited.add(item)
+            items.extend(value for _, value in item.iter_fields())
+        elif isinstance(item, (list, tuple)):
+            items.extend(item)
+        elif isinstance(item, dict):
+            # the cases of a switch are keyed by nodes
+            items.extend(item.keys())
+            items.extend(item.values())
+
+
+def _get_common_prefix_length(first, second):
+    length = min(len(first), len(second))
+    start = 0
+    while start < length:
+        end = min(start + COMPARED_CHUNK_SIZE, length)
+        if first[start:end] != second[start:end]:
+            break
+        start = end
+    while start < length and first[start] == second[start]:
+        start += 1
+    return start
+
+
+def _get_common_suffix_length(first, second, max_length):
+    length = 0
+    while length < max_length:
+        end = min(length + COMPARED_CHUNK_SIZE, max_length)
+        if first[len(first) - end:len(first) - length] \
+                != second[len(second) - end:len(second) - length]:
+            break
+        length = end
+    while length < max_length \
+            and first[-length - 1] == second[-length - 1]:
+        length += 1
+    return length
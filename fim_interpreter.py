@@ -29,8 +29,10 @@ class Interpreter(NodeVisitor):
                 self.visit(variable)
         return self.visit(tree)
 
-    def resolve(self, node, depth):
-        self.locals[node] = depth
+    def resolve(self, node, location):
+        """Records the depth of the scope of the variable node refers to,
+        counted from the innermost one, and the variable's slot in it."""
+        self.locals[node] = location
 
     def set_builtin_globals(self):
         self.globals.define(
@@ -41,42 +43,11 @@ class Interpreter(NodeVisitor):
     def visit_BinOp(self, node):
         left = self.visit(node.left)
         right = self.visit(node.right)
+        operation = node.operation
+        if operation is None:
+            operation = get_binary_operation(node.op)
         try:
-            if node.op.type == Keywords.ADDITION:
-                return left + right
-            elif node.op.type == Keywords.SUBTRACTION:
-                return left - right
-            elif node.op.type == Keywords.MULTIPLICATION:
-                return left * right
-            elif node.op.type == Keywords.DIVISION:
-                return left / right
-            elif node.op.type == Keywords.GREATER_THAN:
-                return left > right
-            elif node.op.type == Keywords.LESS_THAN:
-                return left < right
-            elif node.op.type == Keywords.GREATER_THAN_OR_EQUAL:
-                return left >= right
-            elif node.op.type == Keywords.LESS_THAN_OR_EQUAL:
-                return left <= right
-            elif node.op.type == Keywords.EQUAL:
-                return left == right
-            elif node.op.type == Keywords.NOT_EQUAL:
-                return left != right
-            elif node.op.type == Keywords.AND:
-                if type(left) == float and type(right) == float:
-                    return left + right
-                return left and right
-            elif node.op.type == Keywords.OR:
-                return left or right
-            elif node.op.type == Keywords.XOR:
-                return left ^ right
-            elif node.op.type == Keywords.CONCAT:
-                return stringify(left) + stringify(right)
-            elif node.op.type == Keywords.MODULO:
-                return left % right
-            else:
-                raise FimRuntimeException(node.op,
-                                          f"Unknown operator: {node.op}")
+            return operation(left, right)
         except TypeError:
             raise FimRuntimeException(
                 node.op,
@@ -84,12 +55,15 @@ class Interpreter(NodeVisitor):
                 f' with {stringify(left)} and {stringify(right)}')
 
     def visit_UnaryOp(self, node):
-        op = node.op.type
-        if op == Keywords.NOT:
-            return not (self.visit(node.expr))
+        operation = node.operation
+        if operation is None:
+            operation = UNARY_OPERATIONS.get(node.op.type)
+            if operation is None:
+                return None
+        return operation(self.visit(node.expr))
 
     def visit_Number(self, node):
-        return float(node.value)
+        return node.value
 
     def visit_String(self, node):
         return node.value
@@ -104,7 +78,8 @@ class Interpreter(NodeVisitor):
         return node.value
 
     def visit_Compound(self, node):
-        self.execute_compound(node.children, Environment(self.environment))
+        self.execute_compound(node.children,
+                              Environment(self.environment, node.names))
 
     def visit_Root(self, node):
         for declaration in node.children:
@@ -139,13 +114,32 @@ class Interpreter(NodeVisitor):
 
     def visit_For(self, node):
         self.visit(node.init)
-        body = node.body
-        self.visit(fim_ast.While(node.condition, body))
+        if not isinstance(node.to_value, fim_ast.Number):
+            while self.visit(node.condition):
+                self.visit(node.body)
+            return
+
+        # a number cannot change while looping, so while the variable is
+        # a number too, they are compared without visiting the condition
+        variable = node.condition.left
+        to_value = self.visit(node.to_value)
+        while True:
+            value = self.lookup_variable(variable.token, variable)
+            if type(value) is float:
+                if not value <= to_value:
+                    break
+            elif not self.visit(node.condition):
+                break
+            self.visit(node.body)
 
     def visit_ForIter(self, node):
         self.visit(node.init)
+        location = self.locals.get(node.init)
         for i in iter(self.visit(node.iterable)):
-            self.environment.assign(node.init.left, i)
+            if location is None:
+                self.environment.assign(node.init.left, i)
+            else:
+                self.environment.assign_at(*location, i)
             self.visit(node.body)
 
     def visit_StatementList(self, node):
@@ -157,9 +151,9 @@ class Interpreter(NodeVisitor):
 
     def visit_Assign(self, node):
         value = self.visit(node.right)
-        distance = self.locals.get(node.left)
-        if distance is not None:
-            self.environment.assign_at(distance, node.left.token, value)
+        location = self.locals.get(node.left)
+        if location is not None:
+            self.environment.assign_at(*location, value)
         else:
             try:
                 instance = self.environment.get(special_words.this)
@@ -170,12 +164,19 @@ class Interpreter(NodeVisitor):
         return value
 
     def visit_VariableDeclaration(self, node):
-        var_name = node.left.value
-        self.environment.define(var_name, self.visit(node.right))
+        self.define_declared(node, node.left.value, self.visit(node.right))
+
+    def define_declared(self, node, name, value):
+        """Defines the variable node declares in the current scope."""
+        location = self.locals.get(node)
+        if location is None:
+            self.environment.define(name, value)
+        else:
+            self.environment.assign_at(*location, value)
 
     def visit_Var(self, node):
         val = self.lookup_variable(node.token, node)
-        if hasattr(node, 'index'):
+        if node.index is not None:
             if utility.is_float_and_int(node.index):
                 index = int(node.index)
             else:
@@ -189,9 +190,9 @@ class Interpreter(NodeVisitor):
         return val
 
     def lookup_variable(self, token, node):
-        distance = self.locals.get(node)
-        if distance is not None:
-            return self.environment.get_at(distance, token.value)
+        location = self.locals.get(node)
+        if location is not None:
+            return self.environment.get_at(*location)
         else:
             try:
                 instance = self.environment.get(special_words.this)
@@ -225,24 +226,22 @@ class Interpreter(NodeVisitor):
         raise fim_callable.FimReturn(value)
 
     def visit_Increment(self, node):
-        distance = self.locals.get(node.variable)
+        location = self.locals.get(node.variable)
         if isinstance(node.value, int):
             value = node.value
         else:
             value = self.visit(node.value)
-        if distance is None:
+        if location is None:
             self.environment.modify(node.variable.token, operator.add, value)
         else:
-            self.environment.modify_at(
-                distance, node.variable.token, operator.add, value)
+            self.environment.modify_at(*location, operator.add, value)
 
     def visit_Decrement(self, node):
-        distance = self.locals.get(node.variable)
-        if distance is None:
+        location = self.locals.get(node.variable)
+        if location is None:
             self.environment.modify(node.variable.token, operator.sub, 1)
         else:
-            self.environment.modify_at(
-                distance, node.variable.token, operator.sub, 1)
+            self.environment.modify_at(*location, operator.sub, 1)
 
     def visit_Print(self, node):
         res = self.visit(node.expr)
@@ -256,9 +255,13 @@ class Interpreter(NodeVisitor):
                 Token(line, Literals.STRING, None, None, None, None))))
 
     def visit_Function(self, node):
-        self.environment.declare(node.name)
         fim_function = fim_callable.FimFunction(node, self.environment)
-        self.environment.assign(node.name, fim_function)
+        location = self.locals.get(node)
+        if location is None:
+            self.environment.declare(node.name)
+            self.environment.assign(node.name, fim_function)
+        else:
+            self.environment.assign_at(*location, fim_function)
 
     def visit_Class(self, node):
         superclass = self.lookup_variable(
@@ -348,7 +351,8 @@ class Interpreter(NodeVisitor):
                 elements.append(self.visit(bin_op.right))
                 bin_op = bin_op.left
 
-        self.environment.define(array_name, fim_callable.FimArray(elements))
+        self.define_declared(node, array_name,
+                             fim_callable.FimArray(elements))
 
     def visit_ArrayElementAssignment(self, node):
         array = self.lookup_variable(node.left.token, node.left)
@@ -389,3 +393,47 @@ def stringify(obj):
     if obj is False:
         return "false"
     return str(obj)
+
+
+def add_or_and(left, right):
+    if type(left) == float and type(right) == float:
+        return left + right
+    return left and right
+
+
+def logical_or(left, right):
+    return left or right
+
+
+def concatenate(left, right):
+    return stringify(left) + stringify(right)
+
+
+BINARY_OPERATIONS = {
+    Keywords.ADDITION: operator.add,
+    Keywords.SUBTRACTION: operator.sub,
+    Keywords.MULTIPLICATION: operator.mul,
+    Keywords.DIVISION: operator.truediv,
+    Keywords.GREATER_THAN: operator.gt,
+    Keywords.LESS_THAN: operator.lt,
+    Keywords.GREATER_THAN_OR_EQUAL: operator.ge,
+    Keywords.LESS_THAN_OR_EQUAL: operator.le,
+    Keywords.EQUAL: operator.eq,
+    Keywords.NOT_EQUAL: operator.ne,
+    Keywords.AND: add_or_and,
+    Keywords.OR: logical_or,
+    Keywords.XOR: operator.xor,
+    Keywords.CONCAT: concatenate,
+    Keywords.MODULO: operator.mod,
+}
+
+UNARY_OPERATIONS = {
+    Keywords.NOT: operator.not_,
+}
+
+
+def get_binary_operation(op):
+    operation = BINARY_OPERATIONS.get(op.type)
+    if operation is None:
+        raise FimRuntimeException(op, f"Unknown operator: {op}")
+    return operation
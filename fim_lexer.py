@@ -1,16 +1,35 @@
 import re
+import threading
+from array import array
+from bisect import bisect_right
 from enum import Enum
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
 
 class ReservedWord:
-    def __init__(self, regex, type, block, suffix):
-        self.regex = regex
+    __slots__ = ('regex', 'type', 'block', 'suffix', 'partners',
+                 'partners_in_line')
+
+    def __init__(self, regex, type, block, suffix, partners=(),
+                 partners_in_line=False):
+        self.regex = re.compile(regex)
         self.type = type
         self.block = block
         self.suffix = suffix
+        # the word only matches if one of the partners follows it somewhere
+        # later in the source (or later in the same line)
+        self.partners = partners
+        self.partners_in_line = partners_in_line
 
 
 class Token:
+    __slots__ = ('value', 'type', 'block', 'suffix', 'start', 'end',
+                 'line_map')
+
     def __init__(self, value, type, block, suffix, start, end):
         self.value = value
         self.type = type
@@ -18,6 +37,19 @@ class Token:
         self.suffix = suffix
         self.start = start
         self.end = end
+        self.line_map = None
+
+    @property
+    def line(self):
+        if self.line_map is None:
+            return None
+        return self.line_map.get_line(self.start)
+
+    @property
+    def column(self):
+        if self.line_map is None:
+            return None
+        return self.line_map.get_column(self.start)
 
     def __str__(self):
         return f'{self.value} {self.type} {self.start} {self.end}'
@@ -31,6 +63,41 @@ class Token:
         return Token(None, None, None, None, None, None)
 
 
+class LineMap:
+    """Maps source positions to lines and columns. The line starts are
+    only looked up when the first position is mapped."""
+
+    def __init__(self, source):
+        self.source = source
+        self._line_starts = None
+
+    def _get_line_starts(self):
+        if self._line_starts is None:
+            self._line_starts = array('I', [0])
+            self._line_starts.extend(
+                position + 1 for position in _find_new_lines(self.source))
+        return self._line_starts
+
+    def set_source(self, source):
+        """Maps the edited source, once the positions of the tokens that
+        use this map have been moved along with the edit."""
+        self.source = source
+        self._line_starts = None
+
+    def get_line(self, position):
+        return bisect_right(self._get_line_starts(), position) - 1
+
+    def get_column(self, position):
+        return position - self._get_line_starts()[self.get_line(position)]
+
+
+def _find_new_lines(source):
+    position = source.find('\n')
+    while position != -1:
+        yield position
+        position = source.find('\n', position + 1)
+
+
 class Block(Enum):
     NONE = 0
     BEGIN = 1
@@ -115,29 +182,402 @@ class Keywords(Enum):
         return self.name
 
 
-def match_reserved_words(words, source):
-    res = []
-    for word in words:
-        for m in word.regex.finditer(source):
-            ri = Token(m.group(), word.type, word.block, word.suffix,
-                       m.start(), m.end())
-            res.append(ri)
-    return sorted(res, key=lambda x: (x.start, -x.end, -len(x.value)))
+class Scanner:
+    """Finds reserved words in a single left-to-right pass over the source.
+
+    Most reserved words can only start at the beginning of a word with one
+    of a few known letters, so positions are found by one search for those
+    word starts, and only the words that can start with the character found
+    there are tried, all at once inside one combined regex. The few words
+    that may start anywhere are followed with their own finditer, which
+    also keeps their matches from overlapping each other.
+    """
+
+    def __init__(self, words):
+        self.words = words
+        self._anywhere_words = []
+        words_by_first_char = {}
+        for index, word in enumerate(words):
+            first_chars = _get_word_start_chars(word.regex.pattern)
+            if first_chars is None:
+                self._anywhere_words.append((index, word))
+                continue
+            for char in first_chars:
+                words_by_first_char.setdefault(char, []).append(index)
+
+        # a match attempt reads at most about as many characters as its
+        # pattern is long, up to the end of the line, or, for the few words
+        # that span lines, up to the end of the source
+        self.lookahead = max((len(word.regex.pattern) for word in words),
+                             default=0)
+        self.lookbehind = max((_get_lookbehind(word.regex.pattern)
+                               for word in words), default=0)
+        self._multiline_start_regexes = [
+            _compile_multiline_start_regex(word.regex.pattern)
+            for _, word in self._anywhere_words]
+
+        self._word_start_regex = None
+        word_starts = re.escape(''.join(sorted(words_by_first_char)))
+        if len(words_by_first_char) != 0:
+            self._word_start_regex = re.compile(rf'\b[{word_starts}]')
+        self._start_regex = self._compile_start_regex(word_starts)
+        self._matchers_by_first_char = {
+            char: self._compile_matcher(indices)
+            for char, indices in words_by_first_char.items()}
+
+    def _compile_start_regex(self, word_starts):
+        # finds whether anything can match at all, so empty stretches of
+        # the source are skipped without setting up a scan
+        anywhere_starts = set()
+        for _, word in self._anywhere_words:
+            chars = _get_start_chars(word.regex.pattern)
+            if chars is None:
+                return None
+            anywhere_starts |= chars
+        alternatives = []
+        if len(anywhere_starts) != 0:
+            anywhere_starts = re.escape(''.join(sorted(anywhere_starts)))
+            alternatives.append(f'[{anywhere_starts}]')
+        if word_starts != '':
+            alternatives.append(rf'\b[{word_starts}]')
+        return re.compile('|'.join(alternatives))
+
+    def _compile_matcher(self, indices):
+        # every word is wrapped in an optional lookahead,
+        # so a single match reports all words matching at the position
+        pattern = ''.join(f'(?:(?=({self.words[i].regex.pattern}))|)'
+                          for i in indices)
+        groups = []
+        group = 1
+        for i in indices:
+            groups.append((group, i))
+            group += 1 + self.words[i].regex.groups
+        return re.compile(pattern), groups
+
+    def scan(self, source, pos=0, endpos=None):
+        """Starts scanning source[pos:endpos] in place."""
+        return _Scan(self, source, pos,
+                     len(source) if endpos is None else endpos)
+
+
+class _Scan:
+    def __init__(self, scanner, source, pos, endpos):
+        self.scanner = scanner
+        self.source = source
+        self.pos = pos
+        self.endpos = endpos
+        anywhere_words = scanner._anywhere_words
+        if scanner._start_regex is not None \
+                and scanner._start_regex.search(source, pos, endpos) is None:
+            self.endpos = pos
+            anywhere_words = []
+        self._iterators = [word.regex.finditer(source, pos, endpos)
+                           for _, word in anywhere_words]
+        self._next_matches = [None] * len(self._iterators)
+        # starts of the next matches, past the end when there are none
+        self._next_starts = [pos - 1] * len(self._iterators)
+        # the last matches already passed, which end the furthest
+        self._passed_matches = [None] * len(self._iterators)
+        self._occurrences = {}
+        # how far the source has been read ahead and the partners not found
+        # up to its end, see get_horizon
+        self._read_end = pos
+        self._missing_words = frozenset()
+        self._is_read_to_end = False
+        self._checked_ends = [pos] * len(self._iterators)
+
+    def match(self, pos=None):
+        """Returns tokens for all words matching at the first position
+        starting from pos where any word matches, ordered the same way
+        the lexer resolves them: longest first, then by the word order.
+        Positions must not decrease between calls."""
+        scanner = self.scanner
+        source = self.source
+        pos = self.pos if pos is None else pos
+        while True:
+            anywhere_start = self._skip_anywhere_matches_before(pos)
+            word_start = None
+            if scanner._word_start_regex is not None:
+                word_start_match = scanner._word_start_regex.search(
+                    source, pos, min(anywhere_start + 1, self.endpos))
+                if word_start_match is not None:
+                    word_start = word_start_match.start()
+            if word_start is None and anywhere_start > self.endpos:
+                self._read_end = len(source) + 1
+                return None
+            pos = anywhere_start if word_start is None else word_start
+
+            found = []
+            if word_start is not None:
+                regex, groups = scanner._matchers_by_first_char[source[pos]]
+                spans = regex.match(source, pos, self.endpos).regs
+                for group, index in groups:
+                    start, end = spans[group]
+                    if start != -1 and self._has_partner(
+                            scanner.words[index], end):
+                        found.append((index, start, end))
+            if anywhere_start == pos:
+                for i, start in enumerate(self._next_starts):
+                    if start == pos:
+                        index = scanner._anywhere_words[i][0]
+                        found.append((index, pos, self._next_matches[i].end()))
+            if len(found) != 0:
+                if pos > self._read_end:
+                    self._read_end = pos
+                found.sort(key=lambda x: (-x[2], x[0]))
+                return [self._create_token(*x) for x in found]
+            pos += 1
+
+    def _skip_anywhere_matches_before(self, pos):
+        next_starts = self._next_starts
+        for i, start in enumerate(next_starts):
+            if start < pos:
+                if self._next_matches[i] is not None:
+                    self._passed_matches[i] = self._next_matches[i]
+                match = next(self._iterators[i], None)
+                while match is not None and match.start() < pos:
+                    self._passed_matches[i] = match
+                    match = next(self._iterators[i], None)
+                self._next_matches[i] = match
+                next_starts[i] = self.endpos + 1 if match is None \
+                    else match.start()
+        return min(next_starts, default=self.endpos + 1)
+
+    def _has_partner(self, word, pos):
+        if len(word.partners) == 0:
+            return True
+        line_end = self._find('\n', pos) if word.partners_in_line else -1
+        for partner in word.partners:
+            occurrence = self._find(partner, pos + 1)
+            if occurrence != -1 and (line_end == -1 or occurrence < line_end):
+                return True
+        return False
+
+    def _find(self, substring, pos):
+        # positions mostly grow while scanning, so the last occurrence found
+        # stays valid for many lookups and the source is searched only once
+        searched_from, occurrence = self._occurrences.get(substring, (-1, -1))
+        if searched_from == -1 or pos < searched_from \
+                or (occurrence != -1 and pos > occurrence):
+            occurrence = self.source.find(substring, pos)
+            self._occurrences[substring] = (pos, occurrence)
+        if occurrence == -1:
+            if substring not in self._missing_words:
+                self._missing_words |= {substring}
+        elif occurrence + len(substring) > self._read_end:
+            self._read_end = occurrence + len(substring)
+        return occurrence
+
+    def get_horizon(self, pos):
+        """Returns how far the source has been read to find the words
+        before pos, with the partner words that were looked for up to the
+        end of the source and not found, or None if a word found after
+        pos may still overlap them.
+
+        Scanning on from pos gives the same words as a new scan started
+        at pos, and the words before pos stay the same as long as the
+        source before the horizon does not change and none of the missing
+        partners is added. A horizon past the end means that even
+        appending to the source may change the words."""
+        self._skip_anywhere_matches_before(pos)
+        lookahead = self.scanner.lookahead
+        for i, passed_match in enumerate(self._passed_matches):
+            passed_end = self.pos if passed_match is None \
+                else passed_match.end()
+            if passed_end > pos:
+                return None
+            start_regex = self.scanner._multiline_start_regexes[i]
+            if self._next_matches[i] is None and start_regex is not None \
+                    and not self._is_read_to_end:
+                # a word spanning lines that was not found anymore may have
+                # been looked for up to the end of the source
+                checked_end = max(passed_end, self._checked_ends[i])
+                if start_regex.search(self.source, checked_end,
+                                      pos + lookahead) is not None:
+                    self._is_read_to_end = True
+                self._checked_ends[i] = pos + lookahead
+        if self._is_read_to_end:
+            return len(self.source) + 1, self._missing_words
+        line_end = self.source.find('\n', max(pos, self._read_end)
+                                    + lookahead)
+        return max(self._read_end, len(self.source) + 1 if line_end == -1
+                   else line_end + 1), self._missing_words
+
+    def _create_token(self, index, start, end):
+        word = self.scanner.words[index]
+        return Token(self.source[start:end], word.type, word.block,
+                     word.suffix, start, end)
+
+
+def _get_word_start_chars(pattern):
+    """Returns characters a pattern can start with if it can only match
+    at the beginning of a word, None otherwise."""
+    items = list(sre_parse.parse(pattern))
+    index = 0
+    while index < len(items) \
+            and items[index] == (sre_parse.AT, sre_parse.AT_BOUNDARY):
+        index += 1
+    if index == 0:
+        return None
+    chars, can_be_empty = _get_first_chars(items[index:])
+    if chars is None or can_be_empty \
+            or not all(char.isalnum() or char == '_' for char in chars):
+        return None
+    return chars
+
+
+def _get_lookbehind(pattern):
+    """Returns how many characters before its start a match of pattern
+    may look at."""
+    return _get_items_lookbehind(sre_parse.parse(pattern))
+
+
+def _get_items_lookbehind(items):
+    lookbehind = 0
+    for op, av in items:
+        if op == sre_parse.AT:
+            # word boundaries look at the previous character
+            lookbehind = max(lookbehind, 1)
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            direction, subitems = av
+            lookbehind = max(lookbehind, _get_items_lookbehind(subitems))
+            if direction < 0:
+                lookbehind = max(lookbehind, subitems.getwidth()[1]
+                                 + _get_items_lookbehind(subitems))
+        else:
+            for subitems in _get_subitems(op, av):
+                lookbehind = max(lookbehind, _get_items_lookbehind(subitems))
+    return lookbehind
+
+
+def _compile_multiline_start_regex(pattern):
+    """Returns a regex finding characters where a match of pattern may
+    start reading across any number of lines, None if it never does."""
+    items = list(sre_parse.parse(pattern))
+    for index, item in enumerate(items):
+        if _repeats_new_lines([item]):
+            chars = None
+            if index != 0:
+                chars, can_be_empty = _get_first_chars(items[index - 1:index])
+                chars = None if can_be_empty else chars
+            if chars is None:
+                return re.compile(r'(?s:.)')
+            return re.compile(f'[{re.escape("".join(sorted(chars)))}]')
+    return None
+
+
+def _repeats_new_lines(items):
+    for op, av in items:
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) \
+                and av[1] == sre_parse.MAXREPEAT and _matches_new_line(av[2]):
+            return True
+        if any(_repeats_new_lines(subitems)
+               for subitems in _get_subitems(op, av)):
+            return True
+    return False
+
+
+def _matches_new_line(items):
+    for op, av in items:
+        if op == sre_parse.IN and any(_matches_new_line([in_item])
+                                      for in_item in av):
+            return True
+        if op == sre_parse.LITERAL and av == ord('\n') \
+                or op == sre_parse.RANGE and av[0] <= ord('\n') <= av[1] \
+                or op == sre_parse.CATEGORY and av not in (
+                    sre_parse.CATEGORY_DIGIT, sre_parse.CATEGORY_WORD,
+                    sre_parse.CATEGORY_NOT_LINEBREAK) \
+                or op in (sre_parse.NOT_LITERAL, sre_parse.NEGATE):
+            return True
+        if any(_matches_new_line(subitems)
+               for subitems in _get_subitems(op, av)):
+            return True
+    return False
+
+
+def _get_subitems(op, av):
+    if op == sre_parse.SUBPATTERN:
+        return [av[3]]
+    if op == sre_parse.BRANCH:
+        return av[1]
+    if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+        return [av[2]]
+    if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+        return [av[1]]
+    return []
+
+
+def _get_start_chars(pattern):
+    """Returns characters a pattern can start with, None if they are not
+    known or if the pattern can match an empty string."""
+    chars, can_be_empty = _get_first_chars(list(sre_parse.parse(pattern)))
+    if chars is None or can_be_empty:
+        return None
+    return chars
+
+
+def _get_first_chars(items):
+    chars = set()
+    for item in items:
+        item_chars, can_be_empty = _get_item_first_chars(*item)
+        if item_chars is None:
+            return None, False
+        chars |= item_chars
+        if not can_be_empty:
+            return chars, False
+    return chars, True
+
+
+def _get_item_first_chars(op, av):
+    if op == sre_parse.LITERAL:
+        return {chr(av)}, False
+    if op == sre_parse.IN:
+        chars = set()
+        for in_op, in_av in av:
+            if in_op == sre_parse.LITERAL:
+                chars.add(chr(in_av))
+            elif in_op == sre_parse.RANGE:
+                chars |= {chr(char) for char in range(in_av[0], in_av[1] + 1)}
+            else:
+                return None, False
+        return chars, False
+    if op == sre_parse.SUBPATTERN:
+        group, add_flags, del_flags, items = av
+        if add_flags or del_flags:
+            return None, False
+        return _get_first_chars(items)
+    if op == sre_parse.BRANCH:
+        chars = set()
+        can_be_empty = False
+        for items in av[1]:
+            branch_chars, branch_can_be_empty = _get_first_chars(items)
+            if branch_chars is None:
+                return None, False
+            chars |= branch_chars
+            can_be_empty = can_be_empty or branch_can_be_empty
+        return chars, can_be_empty
+    if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+        min_count, max_count, items = av
+        chars, can_be_empty = _get_first_chars(items)
+        return chars, can_be_empty or min_count == 0
+    if op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+        return set(), True
+    return None, False
 
 
 class Lexer:
     def __init__(self, source=None):
         if source is None:
             source = ''
-        self.source = source
+        self.set_source(source)
         self.tokens = []
-        self._compile_reserved_words()
         self.stack = []
         self.partner_name_stack = []
+        self._start = 0
 
     punctuation_pattern = r'(?:(?:\.\.\.)|[!?‽…:,]|(?:(?!\d)\.(?!\d)))'
     any_allowed_char_pattern = r'(?:.|[,\s])'
-    literals = [
+    literals = (
         ReservedWord(
             r"(?:(?:(?:a )|(?:the ))?(?:(?:letter)|(?:character)) )?"
             r"['‘’].?['‘’]",
@@ -167,8 +607,8 @@ class Lexer:
             r'\bnothing\b',
             Literals.NULL, Block.NONE, Suffix.NONE),
 
-    ]
-    keywords = [
+    )
+    keywords = (
         # STRING is considered literal,
         # but for simplicity we treat it as keyword
         ReservedWord(
@@ -247,10 +687,9 @@ class Lexer:
             r'\b(?:(?:had)|(?:has)) less than\b',
             Keywords.LESS_THAN, Block.NONE, Suffix.INFIX),
         ReservedWord(
-            rf'\bthe difference between(?={any_allowed_char_pattern}+?)'
-            rf'(?!{punctuation_pattern})'
-            rf'(?={any_allowed_char_pattern}+?(?:(?:and)|(?:from)))\b',
-            Keywords.SUBTRACTION, Block.BEGIN_PARTNER, Suffix.PREFIX),
+            rf'\bthe difference between(?!{punctuation_pattern})\b',
+            Keywords.SUBTRACTION, Block.BEGIN_PARTNER, Suffix.PREFIX,
+            partners=('and', 'from')),
         ReservedWord(
             r'\bYour faithful student,',
             Keywords.REPORT, Block.END, Suffix.PREFIX),
@@ -392,10 +831,9 @@ class Lexer:
             r'\bbecame\b',
             Keywords.ASSIGN, Block.NONE, Suffix.INFIX),
         ReservedWord(
-            rf'\bsubtract(?={any_allowed_char_pattern}+?)'
-            rf'(?!{punctuation_pattern})'
-            rf'(?={any_allowed_char_pattern}+?(?:(?:from)|(?:and)))\b',
-            Keywords.SUBTRACTION, Block.BEGIN_PARTNER, Suffix.PREFIX),
+            rf'\bsubtract(?!{punctuation_pattern})\b',
+            Keywords.SUBTRACTION, Block.BEGIN_PARTNER, Suffix.PREFIX,
+            partners=('from', 'and')),
         ReservedWord(
             r'\bmultiply\b',
             Keywords.MULTIPLICATION, Block.BEGIN_PARTNER, Suffix.PREFIX),
@@ -406,15 +844,13 @@ class Lexer:
             r'\balways\b',
             Keywords.CONST, Block.NONE, Suffix.PREFIX),
         ReservedWord(
-            rf'\bdivide(?={any_allowed_char_pattern}+?)'
-            rf'(?!{punctuation_pattern})'
-            rf'(?={any_allowed_char_pattern}+?(?:(?:and)|(?:by)))\b',
-            Keywords.DIVISION, Block.BEGIN_PARTNER, Suffix.PREFIX),
+            rf'\bdivide(?!{punctuation_pattern})\b',
+            Keywords.DIVISION, Block.BEGIN_PARTNER, Suffix.PREFIX,
+            partners=('and', 'by')),
         ReservedWord(
-            rf'\beither(?={any_allowed_char_pattern}+?)'
-            rf'(?!{punctuation_pattern})'
-            rf'(?={any_allowed_char_pattern}+?or)\b',
-            Keywords.XOR, Block.BEGIN_PARTNER, Suffix.PREFIX),
+            rf'\beither(?!{punctuation_pattern})\b',
+            Keywords.XOR, Block.BEGIN_PARTNER, Suffix.PREFIX,
+            partners=('or',)),
         ReservedWord(
             r'\blikes?\b',
             Keywords.VAR, Block.END_PARTNER, Suffix.INFIX),
@@ -455,13 +891,13 @@ class Lexer:
             r'\bwere\b',
             Keywords.EQUAL, Block.NONE, Suffix.INFIX),
         ReservedWord(
-            r'\badd(?=.+?)(?![.,!?‽…:])(?=.+?and)\b',
-            Keywords.ADDITION, Block.BEGIN_PARTNER, Suffix.PREFIX),
+            r'\badd(?![.,!?‽…:])\b',
+            Keywords.ADDITION, Block.BEGIN_PARTNER, Suffix.PREFIX,
+            partners=('and',), partners_in_line=True),
         ReservedWord(
-            rf'\badd(?={any_allowed_char_pattern}+?)'
-            rf'(?!{punctuation_pattern})'
-            rf'(?={any_allowed_char_pattern}+?to)\b',
-            Keywords.INCREMENT, Block.BEGIN_PARTNER, Suffix.PREFIX),
+            rf'\badd(?!{punctuation_pattern})\b',
+            Keywords.INCREMENT, Block.BEGIN_PARTNER, Suffix.PREFIX,
+            partners=('to',)),
         ReservedWord(
             r'\band\b',
             Keywords.ADDITION, Block.END_PARTNER, Suffix.INFIX),
@@ -525,33 +961,114 @@ class Lexer:
         ReservedWord(
             r'\bto\b',
             Keywords.INCREMENT, Block.END_PARTNER, Suffix.PREFIX),
-    ]
+    )
 
     def set_source(self, source):
+        """Sets the program to lex. It can be a string or anything with
+        a read method, such as a file object or an mmap."""
+        if hasattr(source, 'read'):
+            source = source.read()
+        if isinstance(source, bytes):
+            source = source.decode('utf-8')
         self.source = source
 
-    def _compile_reserved_words(self):
-        for word in self.literals + self.keywords:
-            word.regex = re.compile(word.regex)
+    # built once on first use and shared by all lexers and threads
+    keyword_scanner = None
+    literal_scanner = None
+    _scanners_lock = threading.Lock()
+
+    @classmethod
+    def build_scanners(cls):
+        if cls.keyword_scanner is not None:
+            return
+        with cls._scanners_lock:
+            if cls.keyword_scanner is None:
+                Lexer.literal_scanner = Scanner(cls.literals)
+                Lexer.keyword_scanner = Scanner(cls.keywords)
 
     def lex(self):
-        keywords = match_reserved_words(self.keywords, self.source)
-        for keyword_index, keyword in enumerate(keywords):
-            if self._collides_with_previous(keyword):
-                continue
-            if keyword.start != 0:
-                self._add_literals_before(keyword)
-            if self._is_wrong_end_partner(keyword):
-                if keywords[keyword_index + 1].value == keyword.value:
-                    continue
-                elif self.stack[-1].type == Literals.ID:
-                    self._merge(self.stack[-1], keyword)
+        self.tokens = list(self.iter_tokens())
+        return self.tokens
+
+    def lex_lazily(self, start=0, boundaries=None):
+        """Lets get_next_token and peek lex the source on demand, without
+        keeping the tokens taken from the lexer."""
+        self._tokens = []
+        self._set_token_stream(self.iter_tokens(start, boundaries))
+
+    def iter_tokens(self, start=0, boundaries=None):
+        """Yields tokens as soon as later words can no longer change them.
+
+        Reserved words may depend on text far ahead of them, so the whole
+        source is still read, but the tokens are never all kept at once.
+
+        If boundaries is a dict, the ends of punctuation after which the
+        lexer could start over are added to it, each mapped to the horizon
+        of the keyword scan there, see _Scan.get_horizon. Lexing from such
+        a start gives the same tokens after it as lexing from the
+        beginning, as long as the source before the horizon stays the
+        same and no missing partner word is added."""
+        self.build_scanners()
+        line_map = LineMap(self.source)
+        self.stack = []
+        self.partner_name_stack = []
+        self._start = start
+        self._keyword_scan = self.keyword_scanner.scan(self.source, start)
+        keywords = self._keyword_scan.match()
+        while keywords is not None:
+            for keyword_index, keyword in enumerate(keywords):
+                if self._collides_with_previous(keyword):
                     continue
-                else:
-                    keyword.type = Literals.ID
-            self._add_to_stack(keyword)
+                if keyword.start != 0:
+                    self._add_literals_before(keyword)
+                if self._is_wrong_end_partner(keyword):
+                    if self._get_following_keyword(
+                            keywords, keyword_index).value == keyword.value:
+                        continue
+                    elif len(self.stack) != 0 \
+                            and self.stack[-1].type == Literals.ID:
+                        self._merge(self.stack[-1], keyword)
+                        continue
+                    else:
+                        keyword.type = Literals.ID
+                self._add_to_stack(keyword)
+            if boundaries is not None:
+                self._add_boundary(boundaries)
+            yield from self._take_finished_tokens(line_map)
+            keywords = self._keyword_scan.match(
+                max(self._get_latest_token_end(), keywords[0].start + 1))
         self._finish_lex()
-        return self.tokens
+        yield from self._take_finished_tokens(line_map, include_last=True)
+
+    def _add_boundary(self, boundaries):
+        # the lexer can start over after punctuation that leaves
+        # no partner words waiting
+        if len(self.stack) == 0 \
+                or self.stack[-1].type != Keywords.PUNCTUATION \
+                or len(self.partner_name_stack) != 0:
+            return
+        end = self.stack[-1].end
+        horizon = self._keyword_scan.get_horizon(end)
+        if horizon is not None:
+            boundaries[end] = horizon
+
+    def _take_finished_tokens(self, line_map, include_last=False):
+        # only the last token on the stack can still be merged with
+        end = len(self.stack) if include_last else len(self.stack) - 1
+        finished = self.stack[:end]
+        del self.stack[:end]
+        for token in finished:
+            token.line_map = line_map
+        return finished
+
+    def _get_following_keyword(self, keywords, keyword_index):
+        if keyword_index + 1 < len(keywords):
+            return keywords[keyword_index + 1]
+        following = self._keyword_scan.match(
+            keywords[keyword_index].start + 1)
+        if following is None:
+            return Token.default_token()
+        return following[0]
 
     def _collides_with_previous(self, token):
         if token.start == 0 and len(self.stack) == 0:
@@ -559,24 +1076,30 @@ class Lexer:
         return self._get_latest_token_end() > token.start
 
     def _add_literals_before(self, token):
-        start_offset = self._get_latest_token_end()
-        between_tokens = self.source[start_offset:token.start]
-        literals = match_reserved_words(self.literals, between_tokens)
-        if len(literals) == 0:
+        literal_scan = self.literal_scanner.scan(
+            self.source, self._get_latest_token_end(), token.start)
+        literals = literal_scan.match()
+        if literals is None:
             self._add_id_before(token, include_token=False)
+        while literals is not None:
+            if self._add_literals(literals):
+                break
+            literals = literal_scan.match(
+                max(self._get_latest_token_end(), literals[0].start + 1))
+        self._add_id_before(token)
+
+    def _add_literals(self, literals):
         for literal in literals:
-            literal.start += start_offset
-            literal.end += start_offset
             if self._collides_with_previous(literal):
                 continue
             if self._add_id_before(literal):
-                break
+                return True
             self._add_to_stack(literal)
-        self._add_id_before(token)
+        return False
 
     def _get_latest_token_end(self):
         if len(self.stack) == 0:
-            return 0
+            return self._start
         return self.stack[-1].end
 
     def _add_id_before(self, token, include_token=True):
@@ -635,41 +1158,44 @@ class Lexer:
         eof = self._create_token_eof()
         self._add_literals_before(eof)
         self._add_to_stack(eof)
-        self.tokens = self.stack
-        self.stack = []
-        self.add_line_count_to_tokens()
 
     def _create_token_eof(self):
         return Token('EOF', 'EOF', Block.NONE, Suffix.NONE,
                      len(self.source), len(self.source))
 
     def add_line_count_to_tokens(self):
-        new_line_positions = list(self._get_new_line_positions())
-        line_count = 0
-        latest_new_line_pos = 0
-        for index, token in enumerate(self.tokens):
-            while len(new_line_positions) > line_count \
-                    and token.start > new_line_positions[line_count]:
-                latest_new_line_pos = new_line_positions[line_count]
-                line_count += 1
-            token.line = line_count
-            offset = 0 if line_count == 0 else 1
-            token.column = token.start - latest_new_line_pos - offset
+        line_map = LineMap(self.source)
+        for token in self.tokens:
+            token.line_map = line_map
 
     def _get_new_line_positions(self):
-        for index, char in enumerate(self.source):
-            if char == '\n':
-                yield index
+        return _find_new_lines(self.source)
+
+    @property
+    def tokens(self):
+        return self._tokens
+
+    @tokens.setter
+    def tokens(self, tokens):
+        self._tokens = tokens
+        self._set_token_stream(tokens)
+
+    def _set_token_stream(self, tokens):
+        # comments are dropped once on the way, so the parser takes
+        # tokens one by one, with a single token looked ahead for peek
+        self._code_tokens = (token for token in tokens
+                             if token.type != Keywords.COMMENT)
+        self._peeked_token = next(self._code_tokens, None)
+        self.position = 0
 
     def get_next_token(self):
-        if len(self.tokens) == 0:
-            return Token.default_token()
-        token = self.tokens.pop(0)
-        while len(self.tokens) > 0 and token.type == Keywords.COMMENT:
-            token = self.tokens.pop(0)
+        token = self.peek()
+        if self._peeked_token is not None:
+            self._peeked_token = next(self._code_tokens, None)
+            self.position += 1
         return token
 
     def peek(self):
-        if len(self.tokens) == 0:
+        if self._peeked_token is None:
             return Token.default_token()
-        return self.tokens[0]
+        return self._peeked_token
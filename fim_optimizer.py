@@ -0,0 +1,167 @@
+import fim_ast
+from fim_interpreter import Interpreter
+from fim_lexer import Block, Literals, Suffix, Token
+
+LITERAL_TYPES = (fim_ast.Number, fim_ast.String, fim_ast.Char, fim_ast.Bool,
+                 fim_ast.Null)
+# statements that define names in the block they are run in
+DECLARATION_TYPES = (fim_ast.VariableDeclaration, fim_ast.Array,
+                     fim_ast.Function, fim_ast.For, fim_ast.ForIter)
+
+
+class Optimizer:
+    """Rewrites a resolved tree so that it takes less work to interpret.
+
+    Operations on literals only are done once here. An operation that
+    fails is kept, so it fails at runtime the same way as before. Empty
+    statements and branches that can never run are removed.
+
+    locals are the scope distances the resolver found, see
+    Interpreter.resolve. Blocks inside blocks are only merged into them
+    if none of their nodes has a distance, which would change."""
+
+    def __init__(self, locals=None):
+        # literals are evaluated without any environment, and never by
+        # a debugger
+        self.evaluator = Interpreter(None)
+        self.locals = locals
+        self.optimized = {}
+
+    def optimize(self, node):
+        """Optimizes the fields of node and returns the node to use
+        instead of it."""
+        optimized = self.optimized.get(node)
+        if optimized is not None:
+            return optimized
+        self.optimized[node] = node
+        for name, value in node.iter_fields():
+            # the elements of an array are listed with "and", which is
+            # not an operation
+            if isinstance(node, fim_ast.Array) and name == 'elements':
+                continue
+            optimized_value = self.optimize_value(value)
+            if optimized_value is not value:
+                setattr(node, name, optimized_value)
+        optimizer = getattr(self, 'optimize_' + type(node).__name__, None)
+        if optimizer is not None:
+            optimized = optimizer(node)
+            self.optimized[node] = optimized
+            return optimized
+        return node
+
+    def optimize_value(self, value):
+        if isinstance(value, fim_ast.AST):
+            return self.optimize(value)
+        if isinstance(value, list):
+            value[:] = [self.optimize_value(item) for item in value]
+        elif isinstance(value, tuple):
+            return tuple(self.optimize_value(item) for item in value)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                value[key] = self.optimize_value(item)
+        return value
+
+    def optimize_BinOp(self, node):
+        if isinstance(node.left, LITERAL_TYPES) \
+                and isinstance(node.right, LITERAL_TYPES):
+            return self.fold(node, node.left.token, node.right.token)
+        return node
+
+    def optimize_UnaryOp(self, node):
+        if isinstance(node.expr, LITERAL_TYPES):
+            return self.fold(node, node.op, node.expr.token)
+        return node
+
+    def optimize_Root(self, node):
+        node.children = self.optimize_statements(node.children)
+        return node
+
+    def optimize_Compound(self, node):
+        node.children = self.optimize_statements(node.children)
+        return node
+
+    def optimize_statements(self, statements):
+        optimized_statements = []
+        for statement in statements:
+            if isinstance(statement, fim_ast.NoOp):
+                continue
+            if isinstance(statement, fim_ast.Compound) \
+                    and self.can_merge(statement):
+                optimized_statements.extend(statement.children)
+            else:
+                optimized_statements.append(statement)
+        return optimized_statements
+
+    def can_merge(self, block):
+        if self.locals is None or any(isinstance(statement, DECLARATION_TYPES)
+                                      for statement in block.children):
+            return False
+        nodes = [block]
+        while len(nodes) != 0:
+            item = nodes.pop()
+            if isinstance(item, fim_ast.AST):
+                if item in self.locals:
+                    return False
+                nodes.extend(value for _, value in item.iter_fields())
+            elif isinstance(item, (list, tuple)):
+                nodes.extend(item)
+            elif isinstance(item, dict):
+                nodes.extend(item.keys())
+                nodes.extend(item.values())
+        return True
+
+    def optimize_If(self, node):
+        if not isinstance(node.condition, LITERAL_TYPES):
+            return node
+        if self.evaluator.visit(node.condition):
+            return node.then_branch
+        if node.else_branch is not None:
+            return node.else_branch
+        return fim_ast.NoOp()
+
+    def optimize_While(self, node):
+        if isinstance(node.condition, LITERAL_TYPES) \
+                and not self.evaluator.visit(node.condition):
+            return fim_ast.NoOp()
+        return node
+
+    def optimize_DoWhile(self, node):
+        # the body runs once before the condition is checked
+        if isinstance(node.condition, LITERAL_TYPES) \
+                and not self.evaluator.visit(node.condition):
+            return node.body
+        return node
+
+    def fold(self, node, first_token, last_token):
+        try:
+            value = self.evaluator.visit(node)
+        except Exception:
+            return node
+        literal = make_literal(value)
+        if literal is None:
+            return node
+        # the literal takes the place of the whole operation in the source
+        literal.token.start = first_token.start
+        literal.token.end = last_token.end
+        literal.token.line_map = first_token.line_map
+        return literal
+
+
+def make_literal(value):
+    """Returns a literal node that evaluates to value, or None if there is
+    no such node."""
+    if type(value) is bool:
+        return fim_ast.Bool(_make_token(
+            'true' if value else 'false',
+            Literals.TRUE if value else Literals.FALSE))
+    if type(value) is float:
+        return fim_ast.Number(_make_token(repr(value), Literals.NUMBER))
+    if type(value) is str:
+        return fim_ast.String(_make_token(f'"{value}"', Literals.STRING))
+    if value is None:
+        return fim_ast.Null(_make_token('nothing', Literals.NULL))
+    return None
+
+
+def _make_token(value, type):
+    return Token(value, type, Block.NONE, Suffix.NONE, None, None)
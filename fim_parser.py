@@ -4,18 +4,70 @@ import fim_ast
 from fim_lexer import Literals, Block, Suffix, Keywords, Token
 from fim_exception import FimParserException
 
+OR_PRECEDENCE = 1
+AND_PRECEDENCE = 2
+EQUALITY_PRECEDENCE = 3
+COMPARISON_PRECEDENCE = 4
+MODULO_PRECEDENCE = 5
+TERM_PRECEDENCE = 6
+FACTOR_PRECEDENCE = 7
+
+TERM_OPERATORS = (Keywords.ADDITION, Keywords.SUBTRACTION)
+FACTOR_OPERATORS = (Keywords.MULTIPLICATION, Keywords.DIVISION)
+
+LITERALS = {
+    Literals.NUMBER: fim_ast.Number,
+    Literals.STRING: fim_ast.String,
+    Literals.CHAR: fim_ast.Char,
+    Literals.TRUE: fim_ast.Bool,
+    Literals.FALSE: fim_ast.Bool,
+    Literals.NULL: fim_ast.Null,
+}
+
+# precedences of infix operators from the highest, "and" is both an
+# addition and a logical operator
+INFIX_OPERATORS = {
+    Keywords.OR: (OR_PRECEDENCE,),
+    Keywords.AND: (TERM_PRECEDENCE, AND_PRECEDENCE),
+    Keywords.EQUAL: (EQUALITY_PRECEDENCE,),
+    Keywords.NOT_EQUAL: (EQUALITY_PRECEDENCE,),
+    Keywords.GREATER_THAN: (COMPARISON_PRECEDENCE,),
+    Keywords.GREATER_THAN_OR_EQUAL: (COMPARISON_PRECEDENCE,),
+    Keywords.LESS_THAN_OR_EQUAL: (COMPARISON_PRECEDENCE,),
+    Keywords.LESS_THAN: (COMPARISON_PRECEDENCE,),
+    Keywords.MODULO: (MODULO_PRECEDENCE,),
+    Keywords.ADDITION: (TERM_PRECEDENCE,),
+    Keywords.SUBTRACTION: (TERM_PRECEDENCE,),
+    Keywords.MULTIPLICATION: (FACTOR_PRECEDENCE,),
+    Keywords.DIVISION: (FACTOR_PRECEDENCE,),
+}
+
 
 class Parser:
-    def __init__(self, lexer):
+    def __init__(self, lexer, recover=False, spans=None):
+        """With recover, parse collects every syntax error in errors
+        instead of raising the first one and returns what it could parse.
+        If spans is a dict, the source span of every declaration and
+        statement parsed is put into it."""
         self.lexer = lexer
+        self.recover = recover
+        self.spans = spans
+        self.errors = []
+        self.previous_token = None
         self.current_token = self.lexer.get_next_token()
         self.is_currently_parsing_call_arguments_count = 0
 
     def reset(self):
+        self.errors = []
+        self.previous_token = None
         self.current_token = self.lexer.get_next_token()
         self.is_currently_parsing_call_arguments_count = 0
 
     def error(self, message):
+        # a message that has to be built is passed as a function, so that
+        # nothing is built while parsing succeeds
+        if callable(message):
+            message = message()
         raise FimParserException(self.current_token, message)
 
     def next_token(self):
@@ -27,10 +79,33 @@ class Parser:
                 token_block == self.current_token.block)) \
                 and ((token_suffix is None) or (
                 token_suffix == self.current_token.suffix)):
+            self.previous_token = self.current_token
             self.current_token = self.lexer.get_next_token()
         else:
             self.error(message)
 
+    def recover_from(self, error, start_token):
+        if not self.recover:
+            raise error
+        # errors that follow from the previous one are not reported
+        if not self.errors or self.errors[-1].token is not error.token:
+            self.errors.append(error)
+        self.synchronize(start_token)
+
+    def synchronize(self, start_token):
+        # skip to the end of the sentence, or up to the end of the block
+        # that the enclosing statement list is waiting for
+        if self.current_token is start_token \
+                and self.current_token.type != 'EOF':
+            self.previous_token = self.current_token
+            self.current_token = self.lexer.get_next_token()
+        while self.current_token.type != 'EOF' \
+                and self.current_token.block != Block.END:
+            token = self.previous_token = self.current_token
+            self.current_token = self.lexer.get_next_token()
+            if token.type == Keywords.PUNCTUATION:
+                return
+
     def declaration(self):
         if self.current_token.type == Keywords.REPORT:
             return self.class_declaration()
@@ -95,8 +170,8 @@ class Parser:
                  token_block=Block.BEGIN)
         superclass = fim_ast.Var(self.current_token)
         self.eat(Literals.ID,
-                 'Expected addressee (superclass) name. '
-                 f'try "{special_words.base_class_name}"')
+                 lambda: 'Expected addressee (superclass) name. '
+                         f'try "{special_words.base_class_name}"')
 
         return superclass
 
@@ -230,67 +305,60 @@ class Parser:
 
     def statement_list(self, end_token_names=None,
                        end_token_blocks=(Block.END,)):
-        node = self.statement()
-
-        results = [node]
-
-        self.eat(Keywords.PUNCTUATION, 'Expected punctuation')
+        results = []
+        self.add_statement(results)
         while self.current_token.type != 'EOF' \
                 and (end_token_names is None
                      or self.current_token.type not in end_token_names
                      or self.current_token.block not in end_token_blocks):
-            results.append(self.statement())
-            self.eat(Keywords.PUNCTUATION, 'Expected punctuation')
+            self.add_statement(results)
 
         return results
 
+    def add_statement(self, results):
+        """Parses a statement with its punctuation into results."""
+        start_token = self.current_token
+        try:
+            node = self.statement()
+            self.eat(Keywords.PUNCTUATION, 'Expected punctuation')
+        except FimParserException as error:
+            self.recover_from(error, start_token)
+        else:
+            self._add_node(results, node, start_token)
+
+    def add_declaration(self, results):
+        """Parses a top-level declaration or statement into results."""
+        start_token = self.current_token
+        try:
+            node = self.declaration()
+        except FimParserException as error:
+            self.recover_from(error, start_token)
+        else:
+            self._add_node(results, node, start_token)
+
+    def _add_node(self, results, node, start_token):
+        results.append(node)
+        if self.spans is not None:
+            self.spans[node] = (start_token.start, self.previous_token.end)
+
     def statement(self):
-        if self.current_token.type == Keywords.VAR:
-            node = self.variable_declaration()
-        elif self.current_token.type == Keywords.PRINT:
-            node = self.print_statement()
-        elif self.current_token.type == Keywords.INCREMENT:
-            node = self.increment_statement()
-        elif self.current_token.type == Keywords.DECREMENT:
-            node = self.decrement_statement()
-        elif self.current_token.type == Literals.ID \
-                and self.next_token().suffix == Suffix.POSTFIX:
-            node = self.postfix_statement()
-        elif self.current_token.type == Literals.ID:
-            node = self.assignment()
-        elif self.current_token.type == Keywords.IF \
-                and self.current_token.block == Block.BEGIN:
-            node = self.if_statement()
-        elif self.current_token.type == Keywords.WHILE \
-                and self.current_token.block == Block.BEGIN:
-            node = self.while_statement()
-        elif self.current_token.type == Keywords.DO_WHILE \
-                and self.current_token.block == Block.BEGIN:
-            node = self.do_while_statement()
-        elif self.current_token.type == Keywords.FOR \
-                and self.current_token.block == Block.BEGIN_PARTNER \
-                and self.next_token().type == Keywords.FROM \
+        token = self.current_token
+        parse_statement = self.statement_parsers.get(
+            (token.type, token.block, token.suffix))
+        if parse_statement is None:
+            return self.empty()
+        return parse_statement(self)
+
+    def id_statement(self):
+        if self.next_token().suffix == Suffix.POSTFIX:
+            return self.postfix_statement()
+        return self.assignment()
+
+    def any_for_statement(self):
+        if self.next_token().type == Keywords.FROM \
                 and self.next_token().block == Block.BEGIN_PARTNER:
-            node = self.for_statement()
-        elif self.current_token.type == Keywords.FOR:
-            node = self.for_iter_statement()
-        elif self.current_token.type == Keywords.RUN:
-            node = self.run_statement()
-        elif self.current_token.type == Keywords.PARAGRAPH \
-                and self.current_token.block == Block.BEGIN:
-            node = self.function_declaration()
-        elif self.current_token.type == Keywords.MANE_PARAGRAPH \
-                and self.current_token.block == Block.BEGIN:
-            node = self.main_function_declaration()
-        elif self.current_token.type == Keywords.RETURN:
-            node = self.return_statement()
-        elif self.current_token.type == Keywords.READLINE:
-            node = self.read_statement()
-        elif self.current_token.type == Keywords.SWITCH:
-            node = self.switch_statement()
-        else:
-            node = self.empty()
-        return node
+            return self.for_statement()
+        return self.for_iter_statement()
 
     def if_statement(self):
         self.eat(Keywords.IF, 'Expected if keyword, try "If" or "When"')
@@ -555,7 +623,10 @@ class Parser:
         return fim_ast.NoOp()
 
     def expr(self):
-        return self.logic()
+        if self.current_token.type == Keywords.XOR \
+                and self.current_token.suffix == Suffix.PREFIX:
+            return self.logic_xor()
+        return self.logic_or()
 
     def assignment(self):
         expr = self.term()
@@ -597,171 +668,81 @@ class Parser:
             return fim_ast.ArrayElementAssignment(get.object, get.name,
                                                   value)
 
-    def logic(self):
-        return self.logic_xor()
-
     def logic_xor(self):
-        if self.current_token.type in (Keywords.XOR,) \
-                and self.current_token.suffix == Suffix.PREFIX:
-            token = self.current_token
-            self.eat(token.type, 'Expected xor operator,'
-                                 ' try "either ... or ..."',
-                     token_suffix=Suffix.PREFIX)
-            left = self.logic_or()
-            self.eat(token.type, 'Expected xor operator,'
-                                 ' try "either ... or ..."',
-                     token_suffix=Suffix.INFIX)
-            right = self.logic_or()
-            node = fim_ast.BinOp(op=token, left=left, right=right)
-            return node
-        else:
-            return self.logic_or()
-
-    def logic_or(self):
-        left = self.logic_and()
-        while self.current_token.type in (Keywords.OR,) \
-                and self.current_token.suffix == Suffix.INFIX \
-                and self.current_token.block == Block.NONE:
-            op = self.current_token
-            if op.type == Keywords.OR:
-                self.eat(Keywords.OR, 'Expected or operator, try "or"',
-                         token_suffix=Suffix.INFIX)
-
-            right = self.logic_and()
-            left = fim_ast.BinOp(left, op, right)
-
-        return left
-
-    def logic_and(self):
-        left = self.equality()
-
-        while self.current_token.type in (Keywords.AND,) \
-                and self.current_token.suffix == Suffix.INFIX \
-                and self.current_token.block == Block.NONE:
-
-            if self.is_currently_parsing_call_arguments_count != 0:
-                return left
-
-            op = self.current_token
-            if op.type == Keywords.AND:
-                self.eat(Keywords.AND, 'Expected and operator, try "and"',
-                         token_suffix=Suffix.INFIX)
-
-            right = self.equality()
-            left = fim_ast.BinOp(left, op, right)
-
-        return left
-
-    def equality(self):
-        left = self.comparison()
-
-        while self.current_token.type in (Keywords.EQUAL, Keywords.NOT_EQUAL) \
-                and self.current_token.suffix == Suffix.INFIX \
-                and self.current_token.block == Block.NONE:
-            op = self.current_token
-            if op.type == Keywords.EQUAL:
-                self.eat(Keywords.EQUAL, 'Expected equal operator, '
-                                         'try anything from '
-                                         '"is/was/has/had/is equal to"',
-                         token_suffix=Suffix.INFIX)
-            elif op.type == Keywords.NOT_EQUAL:
-                self.eat(Keywords.NOT_EQUAL, 'Expected not equal operator,'
-                                             ' try anything from'
-                                             ' [is/was/has/had][n\'t/ not]"',
-                         token_suffix=Suffix.INFIX)
-
-            right = self.comparison()
-            left = fim_ast.BinOp(left, op, right)
-
-        return left
-
-    def comparison(self):
-        node = self.arithmetic()
-        while self.current_token.type in \
-                (Keywords.GREATER_THAN,
-                 Keywords.GREATER_THAN_OR_EQUAL,
-                 Keywords.LESS_THAN_OR_EQUAL,
-                 Keywords.LESS_THAN) \
-                and self.current_token.suffix == Suffix.INFIX \
-                and self.current_token.block == Block.NONE:
-            token = self.current_token
-            if token.type == Keywords.GREATER_THAN:
-                self.eat(Keywords.GREATER_THAN,
-                         'Expected greater than operator,'
-                         ' try anything from '
-                         '"[is/was/has/had] [more/greater] than"',
-                         token_suffix=Suffix.INFIX)
-            elif token.type == Keywords.GREATER_THAN_OR_EQUAL:
-                self.eat(Keywords.GREATER_THAN_OR_EQUAL,
-                         'Expected greater than or equal operator,'
-                         ' try anything from "[no/not/n’t] less than"',
-                         token_suffix=Suffix.INFIX)
-            elif token.type == Keywords.LESS_THAN_OR_EQUAL:
-                self.eat(Keywords.LESS_THAN_OR_EQUAL,
-                         'Expected less than or equal operator, '
-                         'try anything from'
-                         ' "[no/not/n’t] [more/greater] than"',
-                         token_suffix=Suffix.INFIX)
-            elif token.type == Keywords.LESS_THAN:
-                self.eat(Keywords.LESS_THAN, 'Expected less than operator, '
-                                             'try [is/was/has/had] less than',
-                         token_suffix=Suffix.INFIX)
-            node = fim_ast.BinOp(left=node, op=token, right=self.arithmetic())
+        token = self.current_token
+        self.eat(token.type, 'Expected xor operator,'
+                             ' try "either ... or ..."',
+                 token_suffix=Suffix.PREFIX)
+        left = self.logic_or()
+        self.eat(token.type, 'Expected xor operator,'
+                             ' try "either ... or ..."',
+                 token_suffix=Suffix.INFIX)
+        right = self.logic_or()
+        node = fim_ast.BinOp(op=token, left=left, right=right)
         return node
 
-    def arithmetic(self):
-        node = self.term()
-        while self.current_token.type in (Keywords.MODULO,):
-            token = self.current_token
-            if token.type == Keywords.MODULO:
-                self.eat(Keywords.MODULO, 'Expected modulo operator,'
-                                          ' try "modulo"')
-                node = fim_ast.BinOp(left=node, op=token, right=self.term())
-        return node
+    def logic_or(self):
+        return self.binary_operation(OR_PRECEDENCE)
 
     def term(self):
-        if self.current_token.type == Keywords.INCREMENT:
-            return self.increment_term()
+        return self.binary_operation(TERM_PRECEDENCE)
 
-        operations = (Keywords.ADDITION, Keywords.SUBTRACTION)
-        if self.current_token.type in operations \
-                and self.current_token.suffix == Suffix.PREFIX:
-            return self.prefix_bin_op(operations, self.term)
+    def factor(self):
+        return self.binary_operation(FACTOR_PRECEDENCE)
 
-        node = self.factor()
-        operations = (Keywords.ADDITION, Keywords.SUBTRACTION, Keywords.AND)
-        while self.current_token.type in operations \
-                and self.current_token.suffix == Suffix.INFIX \
-                and self.current_token.block == Block.NONE:
+    def binary_operation(self, min_precedence):
+        node, max_precedence = self.operand(min_precedence)
+        while True:
             token = self.current_token
-            if token.type == Keywords.ADDITION:
-                self.eat(Keywords.ADDITION, 'Expected addition operator',
-                         token_suffix=Suffix.INFIX)
-            elif token.type == Keywords.AND:
-                if self.is_currently_parsing_call_arguments_count != 0:
-                    return node
-                self.eat(Keywords.AND, 'expected addition operator "and"',
-                         token_suffix=Suffix.INFIX)
-            elif token.type == Keywords.SUBTRACTION:
-                self.eat(Keywords.SUBTRACTION,
-                         'expected subtraction operator',
-                         token_suffix=Suffix.INFIX)
-            node = fim_ast.BinOp(left=node, op=token, right=self.factor())
-        return node
+            if token.suffix != Suffix.INFIX or token.block != Block.NONE:
+                return node
+            precedences = INFIX_OPERATORS.get(token.type)
+            if precedences is None:
+                return node
+            if token.type == Keywords.AND \
+                    and self.is_currently_parsing_call_arguments_count != 0:
+                return node
+            for precedence in precedences:
+                if min_precedence <= precedence <= max_precedence:
+                    break
+            else:
+                return node
+            self.previous_token = token
+            self.current_token = self.lexer.get_next_token()
+            right = self.binary_operation(precedence + 1)
+            node = fim_ast.BinOp(left=node, op=token, right=right)
+            # operators of the same level are left associative
+            max_precedence = precedence
+
+    def operand(self, min_precedence):
+        """Parses what may stand left of an infix operator and returns it
+        with the highest precedence an operator after it may have."""
+        token = self.current_token
+        if min_precedence <= TERM_PRECEDENCE:
+            if token.type == Keywords.INCREMENT:
+                return self.increment_term(), TERM_PRECEDENCE - 1
+            if token.type in TERM_OPERATORS \
+                    and token.suffix == Suffix.PREFIX:
+                return self.prefix_bin_op(TERM_OPERATORS, self.term), \
+                    TERM_PRECEDENCE - 1
+        if min_precedence <= FACTOR_PRECEDENCE \
+                and token.type in FACTOR_OPERATORS \
+                and token.suffix == Suffix.PREFIX:
+            return self.prefix_bin_op(FACTOR_OPERATORS, self.factor), \
+                FACTOR_PRECEDENCE - 1
+        return self.unary(), FACTOR_PRECEDENCE
 
     def prefix_bin_op(self, keywords, bin_op_level_function):
         token = self.current_token
-        self.eat(token.type,
-                 f'Expected'
-                 f' {self.get_expected_keywords_names_string(keywords)}'
-                 f' operator',
-                 token_suffix=Suffix.PREFIX)
+
+        def message():
+            return f'Expected' \
+                   f' {self.get_expected_keywords_names_string(keywords)}' \
+                   f' operator'
+
+        self.eat(token.type, message, token_suffix=Suffix.PREFIX)
         left = bin_op_level_function()
-        self.eat(token.type,
-                 f'Expected'
-                 f' {self.get_expected_keywords_names_string(keywords)}'
-                 f' operator',
-                 token_suffix=Suffix.INFIX)
+        self.eat(token.type, message, token_suffix=Suffix.INFIX)
         right = bin_op_level_function()
         node = fim_ast.BinOp(op=token, left=left, right=right)
         return node
@@ -780,24 +761,6 @@ class Parser:
         node = fim_ast.Increment(variable, value)
         return node
 
-    def factor(self):
-        operations = (Keywords.MULTIPLICATION, Keywords.DIVISION)
-        if self.current_token.type in operations \
-                and self.current_token.suffix == Suffix.PREFIX:
-            return self.prefix_bin_op(operations, self.factor)
-        node = self.unary()
-        while self.current_token.type in operations \
-                and self.current_token.suffix == Suffix.INFIX \
-                and self.current_token.block == Block.NONE:
-            token = self.current_token
-            if token.type == Keywords.MULTIPLICATION:
-                self.eat(Keywords.MULTIPLICATION,
-                         'Expected multiplication operator')
-            elif token.type == Keywords.DIVISION:
-                self.eat(Keywords.DIVISION, 'Expected division operator')
-            node = fim_ast.BinOp(left=node, op=token, right=self.unary())
-        return node
-
     def unary(self):
         token = self.current_token
         if token.type == Keywords.NOT:
@@ -833,8 +796,8 @@ class Parser:
         return expr
 
     def concatenation(self):
-        next_token = self.next_token()
         if self._is_concatenation():
+            next_token = self.next_token()
             left = self.primary()
             right = self.expr()
 
@@ -852,37 +815,55 @@ class Parser:
 
     def _is_concatenation(self):
         possible_tokens = (Literals.STRING, Literals.ID)
-        current_is_good = self.current_token.type in possible_tokens
-        next_is_good = self.next_token().type in possible_tokens
-        return current_is_good and next_is_good
+        return self.current_token.type in possible_tokens \
+            and self.next_token().type in possible_tokens
 
     def primary(self):
         token = self.current_token
-        if token.type == Literals.NUMBER:
-            self.eat(Literals.NUMBER, 'Expected number')
-            return fim_ast.Number(token)
-        elif token.type == Literals.STRING:
-            self.eat(Literals.STRING, 'Expected string')
-            return fim_ast.String(token)
-        elif token.type == Literals.CHAR:
-            self.eat(Literals.CHAR, 'Expected char')
-            return fim_ast.Char(token)
-        elif token.type == Literals.TRUE:
-            self.eat(Literals.TRUE, 'Expected true')
-            return fim_ast.Bool(token)
-        elif token.type == Literals.FALSE:
-            self.eat(Literals.FALSE, 'Expected false')
-            return fim_ast.Bool(token)
-        elif token.type == Literals.NULL:
-            self.eat(Literals.NULL, 'Expected null')
-            return fim_ast.Null(token)
-        else:
-            node = self.variable()
-            return node
+        literal = LITERALS.get(token.type)
+        if literal is None:
+            return self.variable()
+        self.previous_token = token
+        self.current_token = self.lexer.get_next_token()
+        return literal(token)
 
     def parse(self):
         statements = []
         while not self.current_token.type == 'EOF':
-            statements.append(self.declaration())
+            self.add_declaration(statements)
 
         return fim_ast.Root(statements)
+
+
+def _get_statement_parsers():
+    # the parsers of statements by (type, block, suffix) of their first token
+    parsers = {}
+
+    def add(token_type, parse, blocks=tuple(Block), suffixes=tuple(Suffix)):
+        for block in blocks:
+            for suffix in suffixes:
+                parsers[token_type, block, suffix] = parse
+
+    add(Keywords.VAR, Parser.variable_declaration)
+    add(Keywords.PRINT, Parser.print_statement)
+    add(Keywords.INCREMENT, Parser.increment_statement)
+    add(Keywords.DECREMENT, Parser.decrement_statement)
+    add(Literals.ID, Parser.id_statement)
+    add(Keywords.IF, Parser.if_statement, blocks=(Block.BEGIN,))
+    add(Keywords.WHILE, Parser.while_statement, blocks=(Block.BEGIN,))
+    add(Keywords.DO_WHILE, Parser.do_while_statement, blocks=(Block.BEGIN,))
+    add(Keywords.FOR, Parser.for_iter_statement)
+    add(Keywords.FOR, Parser.any_for_statement,
+        blocks=(Block.BEGIN_PARTNER,))
+    add(Keywords.RUN, Parser.run_statement)
+    add(Keywords.PARAGRAPH, Parser.function_declaration,
+        blocks=(Block.BEGIN,))
+    add(Keywords.MANE_PARAGRAPH, Parser.main_function_declaration,
+        blocks=(Block.BEGIN,))
+    add(Keywords.RETURN, Parser.return_statement)
+    add(Keywords.READLINE, Parser.read_statement)
+    add(Keywords.SWITCH, Parser.switch_statement)
+    return parsers
+
+
+Parser.statement_parsers = _get_statement_parsers()
@@ -3,8 +3,10 @@ from pathlib import Path
 
 import special_words
 from fim_exception import FimResolverException
-from fim_interpreter import Interpreter
+from fim_interpreter import Interpreter, BINARY_OPERATIONS, \
+    UNARY_OPERATIONS
 from fim_lexer import Lexer, Literals
+from fim_optimizer import Optimizer
 from fim_parser import Parser
 from node_visitor import NodeVisitor
 from enum import Enum
@@ -20,11 +22,27 @@ def interpret(program):
     tree = parser.parse()
     resolver = Resolver(interpreter)
     resolver.resolve(tree)
+    tree = Optimizer(interpreter.locals).optimize(tree)
     interpreter.interpret(tree)
 
     return interpreter.globals, interpreter.locals
 
 
+class Scope(dict):
+    """Maps the names declared in a scope to whether they are defined yet,
+    and keeps the slot of every name, which is the order it was declared
+    in."""
+
+    def __init__(self):
+        super().__init__()
+        self.slots = {}
+
+    def __setitem__(self, name, is_defined):
+        if name not in self.slots:
+            self.slots[name] = len(self.slots)
+        super().__setitem__(name, is_defined)
+
+
 class FunctionType(Enum):
     NONE = 0
     FUNCTION = 1
@@ -44,6 +62,7 @@ class Resolver(NodeVisitor):
         self.globals_for_typechecking = {}
         self.current_function = FunctionType.NONE
         self.current_class = None
+        self.class_scope = None
         self.interpreter.set_builtin_globals()
         self.main_was_initialized = False
         self.interfaces_to_be_checked = {}
@@ -64,6 +83,7 @@ class Resolver(NodeVisitor):
     def visit_Compound(self, node):
         with self.scope():
             self.resolve_statements(node.children)
+            node.names = tuple(self.scopes[-1])
 
     @contextlib.contextmanager
     def scope(self):
@@ -72,7 +92,7 @@ class Resolver(NodeVisitor):
         self._end_scope()
 
     def _begin_scope(self):
-        self.scopes.append({})
+        self.scopes.append(Scope())
         self.scopes_for_typechecking.append({})
 
     def _end_scope(self):
@@ -98,6 +118,7 @@ class Resolver(NodeVisitor):
             type = self.visit(node.right)
             self.set_type(node.left.token, type)
         self.define(node.left)
+        self.resolve_local(node, node.left)
 
     def declare(self, name):
         if len(self.scopes) == 0:
@@ -176,8 +197,15 @@ class Resolver(NodeVisitor):
 
     def resolve_local(self, node, name):
         for i in reversed(range(len(self.scopes))):
-            if name.value in self.scopes[i]:
-                self.interpreter.resolve(node, len(self.scopes) - 1 - i)
+            scope = self.scopes[i]
+            if name.value in scope:
+                # fields are kept by instances, only this report is in
+                # the scope of a method's instance
+                if scope is self.class_scope \
+                        and name.value != special_words.this:
+                    return
+                self.interpreter.resolve(
+                    node, (len(self.scopes) - 1 - i, scope.slots[name.value]))
                 return
 
     def get_type(self, name):
@@ -230,6 +258,7 @@ class Resolver(NodeVisitor):
     def resolve_class_body(self, node):
         with self.scope():
             self.scopes[-1][special_words.this] = True
+            self.class_scope = self.scopes[-1]
             self.current_class = node
 
             for method in node.methods.values():
@@ -240,6 +269,7 @@ class Resolver(NodeVisitor):
                 self.resolve(field)
 
             self.current_class = None
+            self.class_scope = None
 
     def visit_Get(self, node):
         type = self.get_type(node.object.value)
@@ -254,6 +284,7 @@ class Resolver(NodeVisitor):
     def visit_Function(self, node):
         self.declare(node.token)
         self.define(node.token)
+        self.resolve_local(node, node.token)
         self.set_type(node.token, node.return_type)
         self.resolve_function(node, FunctionType.FUNCTION)
 
@@ -358,6 +389,7 @@ class Resolver(NodeVisitor):
     def visit_BinOp(self, node):
         self.resolve(node.left)
         self.resolve(node.right)
+        node.operation = BINARY_OPERATIONS.get(node.op.type)
 
     def visit_FunctionCall(self, node):
         self.resolve(node.name)
@@ -367,6 +399,7 @@ class Resolver(NodeVisitor):
 
     def visit_UnaryOp(self, node):
         self.resolve(node.expr)
+        node.operation = UNARY_OPERATIONS.get(node.op.type)
 
     def visit_NoOp(self, node):
         pass
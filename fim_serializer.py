@@ -0,0 +1,290 @@
+import struct
+import sys
+from array import array
+from enum import Enum
+
+import fim_ast
+from fim_exception import FimSerializationException
+from fim_lexer import Block, Keywords, LineMap, Literals, Suffix, Token
+
+# the magic bytes, the format version, the array type code of the
+# integers and the numbers of strings, floats and integers that follow
+HEADER = struct.Struct('<4sHcIII')
+MAGIC = b'FIMC'
+FORMAT_VERSION = 1
+
+ENUMS = {enum.__name__: enum for enum in (Keywords, Literals, Block, Suffix)}
+
+# every value starts with one of these tags
+(_NONE, _FALSE, _TRUE, _INT, _BIG_INT, _FLOAT, _STRING, _NODE, _TOKEN,
+ _ENUM, _LIST, _TUPLE, _DICT) = range(13)
+
+# the smallest of these that fits every integer is used
+INT_TYPE_CODES = ('b', 'h', 'i', 'q')
+
+
+def dump(tree, source, file):
+    """Writes the tree parsed from source to a binary file."""
+    file.write(dumps(tree, source))
+
+
+def dumps(tree, source):
+    """Returns the tree parsed from source in the .fimc format.
+
+    The nodes and the tokens are kept in flat tables and refer to each
+    other by index, every string is written once and the rest is a single
+    array of integers, so loading is a linear pass without any lexing or
+    parsing. The field names of every node class are written too, a tree
+    is only loaded if the node classes still have the same fields."""
+    return _Writer(source).write(tree)
+
+
+def load(file):
+    """Reads a tree written by dump, returns it with its source."""
+    return loads(file.read())
+
+
+def loads(data):
+    try:
+        return _Reader(data).read()
+    except (struct.error, IndexError, KeyError, ValueError, StopIteration,
+            UnicodeDecodeError) as e:
+        raise FimSerializationException(
+            'The compiled program is damaged') from e
+
+
+class _Writer:
+    def __init__(self, source):
+        self.strings = {}
+        self.floats = array('d')
+        self.classes = {}
+        self.enums = {}
+        self.tokens = {}
+        self.nodes = {}
+        self.node_queue = []
+        self.token_ints = array('q')
+        self.node_ints = array('q')
+        self.source_index = self.add_string(source)
+
+    def write(self, tree):
+        if not isinstance(tree, fim_ast.Root):
+            raise TypeError(f'Cannot compile {type(tree).__name__}')
+        self.add_node(tree)
+        # nodes found while writing the fields are added to the queue
+        for node in self.node_queue:
+            out = self.node_ints
+            for _, value in node.iter_fields():
+                self.add_value(out, value)
+
+        ints = array('q', [self.source_index, len(self.classes)])
+        for cls in self.classes:
+            ints.append(self.add_string(cls.__name__))
+            ints.append(len(cls.__slots__))
+            ints.extend(self.add_string(name) for name in cls.__slots__)
+        ints.append(len(self.enums))
+        for member in self.enums:
+            ints.append(self.add_string(type(member).__name__))
+            ints.append(self.add_string(member.name))
+        ints.append(len(self.tokens))
+        ints.extend(self.token_ints)
+        ints.append(len(self.nodes))
+        ints.extend(self.classes[type(node)] for node in self.node_queue)
+        ints.extend(self.node_ints)
+
+        type_code = _get_int_type_code(min(ints), max(ints))
+        ints = array(type_code, ints)
+        lengths = array('I', map(len, self.strings))
+        text = ''.join(self.strings).encode()
+        if sys.byteorder == 'big':
+            for numbers in (lengths, self.floats, ints):
+                numbers.byteswap()
+        return b''.join((
+            HEADER.pack(MAGIC, FORMAT_VERSION, type_code.encode(),
+                        len(lengths), len(self.floats), len(ints)),
+            lengths.tobytes(), self.floats.tobytes(), ints.tobytes(), text))
+
+    def add_string(self, string):
+        return self.strings.setdefault(string, len(self.strings))
+
+    def add_node(self, node):
+        index = self.nodes.get(node)
+        if index is None:
+            index = self.nodes[node] = len(self.nodes)
+            self.node_queue.append(node)
+            self.classes.setdefault(type(node), len(self.classes))
+        return index
+
+    def add_token(self, token):
+        index = self.tokens.get(token)
+        if index is None:
+            index = self.tokens[token] = len(self.tokens)
+            out = self.token_ints
+            for value in (token.value, token.type, token.block,
+                          token.suffix, token.start, token.end):
+                self.add_value(out, value)
+            # all tokens of a program share a line map of its source
+            out.append(token.line_map is not None)
+        return index
+
+    def add_value(self, out, value):
+        if value is None:
+            out.append(_NONE)
+        elif value is True or value is False:
+            out.append(_TRUE if value else _FALSE)
+        elif isinstance(value, fim_ast.AST):
+            out.extend((_NODE, self.add_node(value)))
+        elif isinstance(value, Token):
+            out.extend((_TOKEN, self.add_token(value)))
+        elif isinstance(value, str):
+            out.extend((_STRING, self.add_string(value)))
+        elif isinstance(value, Enum) and type(value).__name__ in ENUMS:
+            out.extend((_ENUM, self.enums.setdefault(value, len(self.enums))))
+        elif isinstance(value, int):
+            if -2 ** 63 <= value < 2 ** 63:
+                out.extend((_INT, value))
+            else:
+                out.extend((_BIG_INT, self.add_string(str(value))))
+        elif isinstance(value, float):
+            out.extend((_FLOAT, len(self.floats)))
+            self.floats.append(value)
+        elif isinstance(value, (list, tuple)):
+            out.extend((_LIST if isinstance(value, list) else _TUPLE,
+                        len(value)))
+            for item in value:
+                self.add_value(out, item)
+        elif isinstance(value, dict):
+            out.extend((_DICT, len(value)))
+            for key, item in value.items():
+                self.add_value(out, key)
+                self.add_value(out, item)
+        else:
+            raise TypeError(f'Cannot compile {type(value).__name__}')
+
+
+class _Reader:
+    def __init__(self, data):
+        magic, version, type_code, string_count, float_count, int_count = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise FimSerializationException(
+                'The file is not a compiled program')
+        if version != FORMAT_VERSION:
+            raise FimSerializationException(
+                f'The program was compiled to format version {version},'
+                f' only version {FORMAT_VERSION} can be run')
+        offset = HEADER.size
+        lengths = array('I')
+        offset = _read_array(lengths, data, offset, string_count)
+        self.floats = array('d')
+        offset = _read_array(self.floats, data, offset, float_count)
+        if type_code.decode() not in INT_TYPE_CODES:
+            raise ValueError(f'Unknown type code {type_code}')
+        ints = array(type_code.decode())
+        offset = _read_array(ints, data, offset, int_count)
+
+        text = data[offset:].decode()
+        self.strings = []
+        position = 0
+        for length in lengths:
+            self.strings.append(text[position:position + length])
+            position += length
+        if position != len(text):
+            raise ValueError('Unexpected text length')
+        self.ints = iter(ints)
+        self.next_int = self.ints.__next__
+        self.line_map = None
+        self.enums = []
+        self.tokens = []
+        self.nodes = []
+
+    def read(self):
+        next_int = self.next_int
+        strings = self.strings
+        source = strings[next_int()]
+        self.line_map = LineMap(source)
+
+        classes = []
+        for _ in range(next_int()):
+            classes.append(self.read_class())
+        for _ in range(next_int()):
+            enum = ENUMS[strings[next_int()]]
+            self.enums.append(enum[strings[next_int()]])
+
+        read_value = self.read_value
+        for _ in range(next_int()):
+            token = Token(read_value(), read_value(), read_value(),
+                          read_value(), read_value(), read_value())
+            if next_int():
+                token.line_map = self.line_map
+            self.tokens.append(token)
+
+        # the nodes are created first, so that fields can refer to any
+        node_classes = [classes[next_int()] for _ in range(next_int())]
+        self.nodes = [cls.__new__(cls) for cls, _ in node_classes]
+        for node, (_, setters) in zip(self.nodes, node_classes):
+            for setter in setters:
+                setter(node, read_value())
+        if next(self.ints, None) is not None:
+            raise ValueError('Unexpected data after the tree')
+        return self.nodes[0], source
+
+    def read_class(self):
+        name = self.strings[self.next_int()]
+        fields = tuple(self.strings[self.next_int()]
+                       for _ in range(self.next_int()))
+        cls = getattr(fim_ast, name, None)
+        if not (isinstance(cls, type) and issubclass(cls, fim_ast.AST)) \
+                or cls.__slots__ != fields:
+            raise FimSerializationException(
+                'The program was compiled by another version of the'
+                ' interpreter, compile it again')
+        return cls, [getattr(cls, field).__set__ for field in fields]
+
+    def read_value(self):
+        tag = self.next_int()
+        if tag == _NODE:
+            return self.nodes[self.next_int()]
+        if tag == _TOKEN:
+            return self.tokens[self.next_int()]
+        if tag == _NONE:
+            return None
+        if tag == _STRING:
+            return self.strings[self.next_int()]
+        if tag == _ENUM:
+            return self.enums[self.next_int()]
+        if tag == _LIST or tag == _TUPLE:
+            items = [self.read_value() for _ in range(self.next_int())]
+            return items if tag == _LIST else tuple(items)
+        if tag == _FALSE or tag == _TRUE:
+            return tag == _TRUE
+        if tag == _INT:
+            return self.next_int()
+        if tag == _DICT:
+            items = {}
+            for _ in range(self.next_int()):
+                key = self.read_value()
+                items[key] = self.read_value()
+            return items
+        if tag == _FLOAT:
+            return self.floats[self.next_int()]
+        if tag == _BIG_INT:
+            return int(self.strings[self.next_int()])
+        raise ValueError(f'Unknown tag {tag}')
+
+
+def _get_int_type_code(minimum, maximum):
+    for type_code in INT_TYPE_CODES:
+        bits = 8 * array(type_code).itemsize
+        if -2 ** (bits - 1) <= minimum and maximum < 2 ** (bits - 1):
+            return type_code
+    raise ValueError('Integers out of range')
+
+
+def _read_array(numbers, data, offset, count):
+    end = offset + count * numbers.itemsize
+    if end > len(data):
+        raise ValueError('Unexpected end of data')
+    numbers.frombytes(data[offset:end])
+    if sys.byteorder == 'big':
+        numbers.byteswap()
+    return end
@@ -0,0 +1,88 @@
+import time
+import tracemalloc
+from collections import Counter
+
+import fim_ast
+from fim_interpreter import Interpreter
+from fim_lexer import Lexer
+from fim_parser import Parser
+from fim_resolver import Resolver
+
+
+def collect_stats(source):
+    """Lexes, parses and resolves source, returns how long each stage took,
+    the number of tokens, the number of nodes of every class and the peak
+    memory of all three stages."""
+    # the scanners are built once for all programs, not for each one
+    Lexer.build_scanners()
+    start = time.perf_counter()
+    lexer = Lexer(source)
+    lexer.lex()
+    lexed = time.perf_counter()
+    parser = Parser(lexer)
+    tree = parser.parse()
+    parsed = time.perf_counter()
+    Resolver(Interpreter(parser)).resolve(tree)
+    resolved = time.perf_counter()
+
+    # tracing allocations slows everything down, so memory is measured
+    # in a run of its own
+    tracemalloc.start()
+    try:
+        _run_front_end(source)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'lexing_seconds': lexed - start,
+        'parsing_seconds': parsed - lexed,
+        'resolving_seconds': resolved - parsed,
+        'tokens': len(lexer.tokens),
+        'nodes': count_nodes(tree),
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def _run_front_end(source):
+    lexer = Lexer(source)
+    lexer.lex()
+    parser = Parser(lexer)
+    Resolver(Interpreter(parser)).resolve(parser.parse())
+
+
+def count_nodes(tree):
+    """Returns the number of nodes of every class in tree, a node that is
+    in the tree more than once is counted once."""
+    counts = Counter()
+    visited = set()
+    items = [tree]
+    while len(items) != 0:
+        item = items.pop()
+        if isinstance(item, fim_ast.AST):
+            if item in visited:
+                continue
+            visited.add(item)
+            counts[type(item).__name__] += 1
+            items.extend(value for _, value in item.iter_fields())
+        elif isinstance(item, (list, tuple)):
+            items.extend(item)
+        elif isinstance(item, dict):
+            items.extend(item.keys())
+            items.extend(item.values())
+    return counts
+
+
+def format_stats(stats):
+    nodes = stats['nodes']
+    lines = [
+        f'Lexing    {stats["lexing_seconds"]:>9.4f} s'
+        f' {stats["tokens"]:>9} tokens',
+        f'Parsing   {stats["parsing_seconds"]:>9.4f} s'
+        f' {sum(nodes.values()):>9} nodes',
+        f'Resolving {stats["resolving_seconds"]:>9.4f} s',
+        f'Peak memory {stats["peak_memory_bytes"] / 2 ** 20:.2f} MiB',
+        'Nodes by class:',
+    ]
+    lines.extend(f'{count:>9} {name}' for name, count in nodes.most_common())
+    return '\n'.join(lines)
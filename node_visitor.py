@@ -1,8 +1,24 @@
 class NodeVisitor:
+    # the visit methods of every subclass by node class, found on the first
+    # visit of a node of that class
+    visitors = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.visitors = {}
+
     def visit(self, node):
-        method_name = 'visit_' + type(node).__name__
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        visitor = self.visitors.get(type(node))
+        if visitor is None:
+            visitor = self.find_visitor(type(node))
+        return visitor(self, node)
+
+    @classmethod
+    def find_visitor(cls, node_class):
+        method_name = 'visit_' + node_class.__name__
+        visitor = getattr(cls, method_name, cls.generic_visit)
+        cls.visitors[node_class] = visitor
+        return visitor
 
     def generic_visit(self, node):
         raise Exception('No visit_{} method'.format(type(node).__name__))
@@ -5,11 +5,16 @@ import argparse
 from colorama import Fore, Style
 from pathlib import Path
 
+import fim_serializer
+import special_words
+from fim_cache import TreeCache, CACHE_DIRECTORY_NAME
 from fim_debugger import Debugger
 from fim_lexer import Lexer
 from fim_parser import Parser
-from fim_interpreter import Interpreter
+from fim_compiler import CompilingInterpreter
+from fim_optimizer import Optimizer
 from fim_resolver import Resolver
+from fim_stats import collect_stats, format_stats
 from fim_exception import FimException
 
 
@@ -32,48 +37,122 @@ def handle_errors(function):
     return wrapper
 
 
-@handle_errors
-def interpret(program):
+def parse(program, cache=None):
     lexer = Lexer(program)
-    lexer.lex()
+    tree = None if cache is None else cache.load(lexer.source)
+    if tree is None:
+        lexer.lex_lazily()
     parser = Parser(lexer)
-    interpreter = Interpreter(parser)
-    tree = parser.parse()
+    if tree is None:
+        tree = parser.parse()
+        if cache is not None:
+            cache.save(lexer.source, tree)
+    return lexer, parser, tree
+
+
+def load_compiled(compiled_file, cache=None):
+    tree, source = fim_serializer.load(compiled_file)
+    lexer = Lexer(source)
+    return lexer, Parser(lexer), tree
+
+
+@handle_errors
+def interpret(program, cache=None, load=parse):
+    lexer, parser, tree = load(program, cache)
+    interpreter = CompilingInterpreter(parser)
     resolver = Resolver(interpreter)
     resolver.resolve(tree)
+    tree = Optimizer(interpreter.locals).optimize(tree)
     interpreter.interpret(tree)
 
 
 @handle_errors
-def debug(program):
-    lexer = Lexer(program)
-    lexer.lex()
-    parser = Parser(lexer)
-    interpreter = Debugger(parser, program)
-    tree = parser.parse()
+def debug(program, cache=None, load=parse):
+    lexer, parser, tree = load(program, cache)
+    interpreter = Debugger(parser, lexer.source)
     resolver = Resolver(interpreter)
     resolver.resolve(tree)
+    # the debugger steps through the program as it is written, so it is
+    # not optimized
     interpreter.interpret(tree)
 
 
-def interpret_file(absolute_path, interpret_function=interpret):
+def check(program, cache=None):
+    lexer = Lexer(program)
+    lexer.lex_lazily()
+    parser = Parser(lexer, recover=True)
+    parser.parse()
+    for error in parser.errors:
+        print(f'{Fore.RED}{type(error).__name__}:'
+              f' {str(error)}{Style.RESET_ALL}')
+    return not parser.errors
+
+
+@handle_errors
+def stats(program, cache=None):
+    source = program.read() if hasattr(program, 'read') else program
+    print(format_stats(collect_stats(source)))
+
+
+@handle_errors
+def compile_program(program, compiled_path):
+    lexer, parser, tree = parse(program)
+    temporary_path = compiled_path.with_name(f'{compiled_path.name}.tmp')
+    with temporary_path.open('wb') as compiled_file:
+        fim_serializer.dump(tree, lexer.source, compiled_file)
+    temporary_path.replace(compiled_path)
+    return True
+
+
+def compile_file(absolute_path):
+    if not absolute_path.is_file():
+        print(f'{Fore.RED}File not found{Style.RESET_ALL}')
+        return False
+
+    compiled_path = absolute_path.with_suffix(
+        special_words.compiled_extension)
+    with absolute_path.open('r') as program_file:
+        return compile_program(program_file, compiled_path) is True
+
+
+def interpret_file(absolute_path, interpret_function=interpret,
+                   use_cache=True):
     if not absolute_path.is_file():
         print(f'{Fore.RED}File not found{Style.RESET_ALL}')
         return
 
+    if absolute_path.suffix == special_words.compiled_extension:
+        with absolute_path.open('rb') as compiled_file:
+            return interpret_function(compiled_file, load=load_compiled)
+
+    cache = TreeCache(absolute_path) if use_cache else None
     with absolute_path.open('r') as program_file:
-        program = program_file.read()
-        interpret_function(program)
+        return interpret_function(program_file, cache)
 
 
 def interpret_from_command_line():
     args = parse_args()
     path = args.path
     is_debug = args.debug
+    use_cache = not args.no_cache
+    if (args.compile or args.stats or args.check) \
+            and Path(path).suffix == special_words.compiled_extension:
+        print(f'{Fore.RED}Expected a {special_words.extension} file,'
+              f' not a compiled program{Style.RESET_ALL}')
+        sys.exit(1)
+    if args.compile:
+        is_compiled = compile_file(Path(path).absolute())
+        sys.exit(0 if is_compiled else 1)
+    if args.stats:
+        interpret_file(Path(path).absolute(), stats, use_cache=False)
+        return
+    if args.check:
+        is_correct = interpret_file(Path(path).absolute(), check)
+        sys.exit(0 if is_correct else 1)
     if is_debug:
-        interpret_file(Path(path).absolute(), debug)
+        interpret_file(Path(path).absolute(), debug, use_cache)
     else:
-        interpret_file(Path(path).absolute())
+        interpret_file(Path(path).absolute(), use_cache=use_cache)
 
 
 def parse_args():
@@ -87,6 +166,23 @@ def add_args(parser):
     parser.add_argument('-d', '--debug',
                         action='store_true',
                         help='debug')
+    parser.add_argument('-c', '--check',
+                        action='store_true',
+                        help='report every syntax error without running')
+    parser.add_argument('--stats',
+                        action='store_true',
+                        help='report the time and memory taken to lex, '
+                             'parse and resolve without running, '
+                             'and the numbers of tokens and nodes')
+    parser.add_argument('--compile',
+                        action='store_true',
+                        help=f'save the parsed program to a '
+                             f'{special_words.compiled_extension} file '
+                             f'next to it without running')
+    parser.add_argument('--no-cache',
+                        action='store_true',
+                        help=f'do not use or write parsed programs '
+                             f'in {CACHE_DIRECTORY_NAME}')
 
 
 if __name__ == '__main__':
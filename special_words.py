@@ -1,3 +1,4 @@
 this = 'this report'
 extension = '.fim'
+compiled_extension = '.fimc'
 base_class_name = 'Princess Celestia'